@@ -15,6 +15,9 @@ ACTION_MAP = {
     "query_threatfox": query_threatfox,
 }
 
+# Prompts containing any of these get the autonomous investigation treatment
+AUTONOMOUS_KEYWORDS = ("investigate", "analyze", "full analysis", "autonomous", "deep dive")
+
 class AnalysisState:
     """Tracks the state of an ongoing analysis session"""
     def __init__(self, initial_prompt: str):
@@ -399,9 +402,9 @@ def handle_input(prompt: str) -> str:
     """
     Enhanced input handler with autonomous investigation capability
     """
-    # Check if this should trigger autonomous mode
-    autonomous_keywords = ["investigate", "analyze", "full analysis", "autonomous", "deep dive"]
-    should_go_autonomous = any(keyword in prompt.lower() for keyword in autonomous_keywords)
+    # Check if this should trigger autonomous mode (lowercase the prompt once, not per keyword)
+    lowered = prompt.lower()
+    should_go_autonomous = any(keyword in lowered for keyword in AUTONOMOUS_KEYWORDS)
     
     if should_go_autonomous or len(prompt.split()) > 10:  # Complex queries get autonomous treatment
         return autonomous_investigation(prompt)
@@ -1,29 +1,80 @@
+import os
 import socket
+import struct
+import sys
 from typing import Optional
 from LegacyCode.llm_client import handle_input  # move your core input handler here
 
 HOST = "127.0.0.1"
 PORT = 9999
 
+# Frames are a 4-byte big-endian length followed by that many UTF-8 bytes;
+# a zero-length frame ends the session
+FRAME_HEADER = struct.Struct(">I")
+
+def recv_frame(rfile) -> Optional[bytes]:
+    """Read one length-prefixed frame, or None if the peer closed the connection"""
+    header = rfile.read(FRAME_HEADER.size)
+    if len(header) < FRAME_HEADER.size:
+        return None
+    (length,) = FRAME_HEADER.unpack(header)
+    payload = rfile.read(length)
+    return payload if len(payload) == length else None
+
+# Socket tuning for small interactive frames and multi-KB answers
+RCVBUF_SIZE = 1 << 20
+SNDBUF_SIZE = 256 << 10
+
+def tune_buffers(sock: socket.socket):
+    """Enlarge kernel buffers; set before listen/connect so the TCP window scales"""
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RCVBUF_SIZE)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SNDBUF_SIZE)
+
+def quickack(sock: socket.socket):
+    """Linux only: ACK immediately instead of waiting on delayed-ACK (resets after use)"""
+    if hasattr(socket, 'TCP_QUICKACK'):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+
+def send_frame(wfile, payload: bytes):
+    """Write one length-prefixed frame"""
+    wfile.write(FRAME_HEADER.pack(len(payload)) + payload)
+    wfile.flush()
+
 def handle_client(conn: socket.socket, addr):
     print(f"[MCP-Server] Connection from {addr}")
-    with conn:
+    conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    # Length-prefixed frames over a buffered reader: whole messages of any
+    # size no matter how TCP splits or coalesces them on the wire
+    with conn, conn.makefile('rb', buffering=65536) as rfile, conn.makefile('wb', buffering=0) as wfile:
         while True:
-            data = conn.recv(4096)
-            if not data:
-                print(f"[MCP-Server] Connection closed by {addr}")
+            frame = recv_frame(rfile)
+            if not frame:
                 break
-            user_prompt = data.decode().strip()
+            quickack(conn)
+            user_prompt = frame.decode('utf-8')
             print(f"[MCP-Server] Received: {user_prompt}")
             try:
                 response = handle_input(user_prompt)
             except Exception as e:
                 response = f"[MCP-Server] Internal error: {e}"
-            conn.sendall(response.encode())
+            send_frame(wfile, response.encode())
+        print(f"[MCP-Server] Connection closed by {addr}")
+
+def run_server(host: str = HOST, port: int = PORT, workers: Optional[int] = None):
+    # On Linux, prefork one worker per core; each binds its own SO_REUSEPORT
+    # socket so the kernel load-balances incoming connections between them.
+    # macOS SO_REUSEPORT does not balance accepts, so stay single-process there.
+    reuse_port = sys.platform.startswith('linux') and hasattr(socket, 'SO_REUSEPORT')
+    if reuse_port:
+        for _ in range((workers or os.cpu_count() or 1) - 1):
+            if os.fork() == 0:
+                break
 
-def run_server(host: str = HOST, port: int = PORT):
-    print(f"[MCP-Server] Listening on {host}:{port}")
+    print(f"[MCP-Server] Worker {os.getpid()} listening on {host}:{port}")
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        if reuse_port:
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        tune_buffers(s)  # Inherited by accepted connections
         s.bind((host, port))
         s.listen()
         while True:
@@ -1,19 +1,35 @@
+import orjson
 import requests
-import json
 
 OLLAMA_URL = "http://localhost:11434/api/chat"
 
-payload = {
-    "model": "qwen3:8b",
-    "messages": [
+# One keep-alive session so repeated chats reuse the same connection to Ollama
+_OLLAMA = requests.Session()
+_OLLAMA.headers["Connection"] = "keep-alive"
+
+def chat(messages, model: str = "qwen3:8b", timeout: int = 120):
+    """Stream an Ollama chat, yielding content chunks as they are generated."""
+    payload = {"model": model, "messages": messages, "stream": True}
+    with _OLLAMA.post(OLLAMA_URL, data=orjson.dumps(payload),
+                      headers={"Content-Type": "application/json"},
+                      timeout=timeout, stream=True) as resp:
+        resp.raise_for_status()
+        # Ollama streams one JSON object per line until "done"
+        for line in resp.iter_lines():
+            if not line:
+                continue
+            chunk = orjson.loads(line)
+            yield chunk.get("message", {}).get("content", "")
+            if chunk.get("done"):
+                break
+
+if __name__ == "__main__":
+    messages = [
         {"role": "system", "content": "You are a cybersecurity SOC analyst. Respond concisely."},
         {"role": "user", "content": "Explain what ThreatFox is in two sentences."}
-    ],
-    "stream": False
-}
-
-resp = requests.post(OLLAMA_URL, json=payload, timeout=120)
-resp.raise_for_status()
+    ]
 
-data = resp.json()
-print("\nAssistant:", data["message"]["content"].strip())
+    print("\nAssistant: ", end="", flush=True)
+    for token in chat(messages):
+        print(token, end="", flush=True)
+    print()
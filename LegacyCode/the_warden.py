@@ -1,37 +1,173 @@
+import queue
 import socket
+import struct
+import sys
+import threading
+from collections import deque
+from concurrent.futures import Future
 
 HOST = "127.0.0.1"
 PORT = 9999
 
+# Frames are a 4-byte big-endian length followed by that many UTF-8 bytes
+FRAME_HEADER = struct.Struct(">I")
+
+def recv_frame(rfile):
+    """Read one length-prefixed frame, or None if the server closed the connection"""
+    header = rfile.read(FRAME_HEADER.size)
+    if len(header) < FRAME_HEADER.size:
+        return None
+    (length,) = FRAME_HEADER.unpack(header)
+    payload = rfile.read(length)
+    return payload if len(payload) == length else None
+
+# Socket tuning for small interactive frames and multi-KB answers
+RCVBUF_SIZE = 1 << 20
+SNDBUF_SIZE = 256 << 10
+
+def quickack(sock):
+    """Linux only: ACK immediately instead of waiting on delayed-ACK (resets after use)"""
+    if hasattr(socket, 'TCP_QUICKACK'):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+
+def send_frame(wfile, payload: bytes):
+    """Write one length-prefixed frame"""
+    wfile.write(FRAME_HEADER.pack(len(payload)) + payload)
+    wfile.flush()
+
+def print_frame(frame: bytes):
+    """Write a UTF-8 reply to the terminal as-is, skipping a bytes -> str decode"""
+    sys.stdout.flush()  # Keep ordering with text already printed
+    sys.stdout.buffer.write(frame.strip())
+    sys.stdout.buffer.write(b"\n\n")
+    sys.stdout.buffer.flush()
+
+class PipelinedClient:
+    """Send frames without waiting for replies; replies resolve Futures in send order.
+    
+    The server answers the frames of one connection strictly in order, so the
+    oldest pending Future always belongs to the next frame read back.
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.rfile = sock.makefile('rb', buffering=65536)
+        self.wfile = sock.makefile('wb', buffering=0)
+        self.in_queue = queue.Queue()
+        self.pending = deque()
+        self.lock = threading.Lock()
+        self.writer = threading.Thread(target=self._write_loop, name="mcp-writer", daemon=True)
+        self.reader = threading.Thread(target=self._read_loop, name="mcp-reader", daemon=True)
+        self.writer.start()
+        self.reader.start()
+
+    def send(self, payload: bytes) -> Future:
+        """Queue one frame; the Future resolves to its reply (None if the server closed)"""
+        future = Future()
+        with self.lock:
+            # Registered before the frame is written so the reader always finds it
+            self.pending.append(future)
+            self.in_queue.put(payload)
+        return future
+
+    def _write_loop(self):
+        while True:
+            payload = self.in_queue.get()
+            if payload is None:
+                return
+            try:
+                send_frame(self.wfile, payload)
+            except OSError as e:
+                self._fail_pending(e)
+                return
+
+    def _read_loop(self):
+        while True:
+            try:
+                frame = recv_frame(self.rfile)
+                quickack(self.sock)
+            except OSError as e:
+                self._fail_pending(e)
+                return
+            if frame is None:
+                self._fail_pending(None)
+                return
+            with self.lock:
+                future = self.pending.popleft() if self.pending else None
+            if future is not None:
+                future.set_result(frame)
+
+    def _fail_pending(self, error):
+        """Resolve every outstanding request once the connection is gone"""
+        with self.lock:
+            while self.pending:
+                future = self.pending.popleft()
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+
+    def close(self):
+        """Stop the writer, wake the reader with EOF, then close the socket files"""
+        self.in_queue.put(None)
+        self.writer.join(timeout=1.0)
+        # The reader holds rfile's lock while blocked in recv; shutdown makes that recv
+        # return EOF so rfile.close() does not wait on an idle server forever
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass  # Already disconnected
+        self.reader.join(timeout=1.0)
+        self.wfile.close()
+        self.rfile.close()
+
 def main():
     print("[MCP-Client] Connected to MCP. Type commands like:")
     print("   search: suspicious IP 8.8.8.8")
     print("   tell me about 25.89.123.156")
+    print("Separate several queries with ';' to pipeline them.")
     print("Type 'exit' or 'quit' to stop.\n")
 
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        # Buffer sizes must be set before connect for the TCP window to scale
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RCVBUF_SIZE)
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SNDBUF_SIZE)
         s.connect((HOST, PORT))
+        # Small interactive frames: send immediately and keep the idle connection alive
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
         
-        while True:
-            msg = input(">> ").strip()
-            if msg.lower() in {"exit", "quit"}:
-                print("[MCP-Client] Exiting.")
-                break
-
-            try:
-                s.sendall(msg.encode())
-                data = s.recv(8192).decode()
-
-                if not data:
-                    print("[MCP-Client] No response received.")
+        client = PipelinedClient(s)
+        try:
+            while True:
+                msg = input(">> ").strip()
+                if msg.lower() in {"exit", "quit"}:
+                    print("[MCP-Client] Exiting.")
+                    break
+                # Empty queries are dropped: an empty frame would close the session server-side
+                queries = [q.strip() for q in msg.split(";") if q.strip()]
+                if not queries:
                     continue
 
-                print("\n[Response From MCP]:")
-                print(data.strip())
-                print()
+                try:
+                    # All queries go out back to back; replies are awaited afterwards
+                    futures = [client.send(q.encode()) for q in queries]
+                    closed = False
+                    for query, future in zip(queries, futures):
+                        frame = future.result()
+                        if frame is None:
+                            closed = True
+                            break
+                        print(f"\n[Response From MCP] ({query}):" if len(queries) > 1 else "\n[Response From MCP]:")
+                        print_frame(frame)
+                    if closed:
+                        print("[MCP-Client] Connection closed by server.")
+                        break
 
-            except Exception as e:
-                print(f"[MCP-Client] Error: {e}")
+                except Exception as e:
+                    print(f"[MCP-Client] Error: {e}")
+        finally:
+            client.close()
 
 if __name__ == "__main__":
     main()
@@ -5,10 +5,14 @@ Provides IP reputation checking capabilities via the AbuseIPDB API
 """
 
 import asyncio
+import base64
 import json
+import zlib
 import sys
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import ipaddress
 from typing import Any, Dict, List, Optional
 from dotenv import load_dotenv
@@ -16,11 +20,26 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+# Results larger than this are gzip-compressed for clients that negotiated it
+GZIP_THRESHOLD = 4096
+
+def create_http_session() -> requests.Session:
+    """Pooled keep-alive session that retries transient upstream failures"""
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    return session
+
 class AbuseIPDBServer:
     def __init__(self):
         self.name = "abuseipdb-server"
         self.version = "1.0.0"
+        self.session = create_http_session()  # Reused across tool calls
         self.api_key = os.getenv("ABUSEIPDB_API_KEY")
+        self.gzip_enabled = False  # Set during initialize from clientInfo
         
         if not self.api_key:
             print("Warning: ABUSEIPDB_API_KEY not found in environment", file=sys.stderr)
@@ -46,14 +65,17 @@ class AbuseIPDBServer:
 
     async def handle_initialize(self, request_id: int, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle initialization request"""
+        client_info = params.get("clientInfo") or {}
+        self.gzip_enabled = "gzip" in str(client_info.get("accept-encoding", ""))
+        capabilities = {"tools": {}}
+        if self.gzip_enabled:
+            capabilities["experimental"] = {"gzip": {"threshold": GZIP_THRESHOLD}}
         return {
             "jsonrpc": "2.0",
             "id": request_id,
             "result": {
                 "protocolVersion": "2024-11-05",
-                "capabilities": {
-                    "tools": {}
-                },
+                "capabilities": capabilities,
                 "serverInfo": {
                     "name": self.name,
                     "version": self.version
@@ -174,7 +196,7 @@ class AbuseIPDBServer:
         }
 
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=10)
+            response = self.session.get(url, headers=headers, params=params, timeout=10)
             
             if response.status_code != 200:
                 return {
@@ -258,6 +280,22 @@ class AbuseIPDBServer:
         else:
             return "CLEAN"
 
+    def compress_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace a large result with {"_gzip": base64(gzip(result JSON))} if the client accepts it"""
+        if not self.gzip_enabled or not isinstance(response, dict) or "result" not in response:
+            return response
+        payload = json.dumps(response["result"]).encode()
+        if len(payload) <= GZIP_THRESHOLD:
+            return response
+        # Level 1: most of the ratio of the default level at a fraction of the CPU
+        compressor = zlib.compressobj(1, zlib.DEFLATED, 31)
+        packed = compressor.compress(payload) + compressor.flush()
+        return {
+            "jsonrpc": "2.0",
+            "id": response.get("id"),
+            "result": {"_gzip": base64.b64encode(packed).decode("ascii")}
+        }
+
     def error_response(self, request_id: int, code: int, message: str) -> Dict[str, Any]:
         """Generate error response"""
         return {
@@ -284,7 +322,19 @@ class AbuseIPDBServer:
                 
                 try:
                     request = json.loads(line.strip())
-                    response = await self.handle_request(request)
+                    if isinstance(request, list):
+                        # JSON-RPC batch: answer every call in one response array
+                        response = [
+                            await self.handle_request(item) if isinstance(item, dict)
+                            else self.error_response(None, -32600, "Invalid Request")
+                            for item in request
+                        ] or self.error_response(None, -32600, "Invalid Request: empty batch")
+                    else:
+                        response = await self.handle_request(request)
+                    if isinstance(response, list):
+                        response = [self.compress_response(item) for item in response]
+                    else:
+                        response = self.compress_response(response)
                     
                     # Write response to stdout
                     print(json.dumps(response), flush=True)
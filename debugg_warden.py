@@ -3,6 +3,7 @@
 debug_warden.py - Debug and test The Warden components
 """
 import json
+import logging
 from mcp_manager import MCPManager
 from tool_executor import ToolExecutor
 
@@ -159,6 +160,8 @@ def check_config():
 
 def main():
     """Run debug tests"""
+    # Show every tool call trace, not just warnings and summaries
+    logging.getLogger("tool_executor").setLevel(logging.DEBUG)
     print("🛡️  THE WARDEN DEBUG TOOL")
     print("=" * 50)
     
@@ -5,20 +5,38 @@ Provides Elasticsearch querying capabilities for SIEM operations
 """
 
 import asyncio
+import base64
 import json
+import zlib
 import sys
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Any, Dict, List, Optional
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Results larger than this are gzip-compressed for clients that negotiated it
+GZIP_THRESHOLD = 4096
+
+def create_http_session() -> requests.Session:
+    """Pooled keep-alive session that retries transient upstream failures"""
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    return session
+
 class ElasticsearchServer:
     def __init__(self):
         self.name = "elasticsearch-server"
         self.version = "1.0.0"
+        self.session = create_http_session()  # Reused across tool calls
         
         # For development - hardcoded, but configurable for future
         self.host = "192.168.1.222"
@@ -31,6 +49,7 @@ class ElasticsearchServer:
         
         self.base_url = f"http://{self.host}:{self.port}"
         self.default_limit = 5
+        self.gzip_enabled = False  # Set during initialize from clientInfo
 
     async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Handle incoming MCP requests"""
@@ -53,14 +72,17 @@ class ElasticsearchServer:
 
     async def handle_initialize(self, request_id: int, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle initialization request"""
+        client_info = params.get("clientInfo") or {}
+        self.gzip_enabled = "gzip" in str(client_info.get("accept-encoding", ""))
+        capabilities = {"tools": {}}
+        if self.gzip_enabled:
+            capabilities["experimental"] = {"gzip": {"threshold": GZIP_THRESHOLD}}
         return {
             "jsonrpc": "2.0",
             "id": request_id,
             "result": {
                 "protocolVersion": "2024-11-05",
-                "capabilities": {
-                    "tools": {}
-                },
+                "capabilities": capabilities,
                 "serverInfo": {
                     "name": self.name,
                     "version": self.version
@@ -325,7 +347,7 @@ class ElasticsearchServer:
         url = f"{self.base_url}/*/_search"
         
         try:
-            response = requests.post(url, json=query, timeout=30)
+            response = self.session.post(url, json=query, timeout=30)
             
             if response.status_code != 200:
                 return {
@@ -376,7 +398,7 @@ class ElasticsearchServer:
         url = f"{self.base_url}/*/_search"
         
         try:
-            response = requests.post(url, json=query, timeout=30)
+            response = self.session.post(url, json=query, timeout=30)
             
             if response.status_code != 200:
                 return {
@@ -414,7 +436,7 @@ class ElasticsearchServer:
         url = f"{self.base_url}/_cat/indices?v&format=json"
         
         try:
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
             
             if response.status_code != 200:
                 return {
@@ -477,7 +499,7 @@ class ElasticsearchServer:
         url = f"{self.base_url}/{index}/_search"
         
         try:
-            response = requests.post(url, json=es_query, timeout=30)
+            response = self.session.post(url, json=es_query, timeout=30)
             
             if response.status_code != 200:
                 return {
@@ -519,7 +541,7 @@ class ElasticsearchServer:
         url = f"{self.base_url}/{index}/_doc/{doc_id}"
         
         try:
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
             
             if response.status_code == 404:
                 return {"error": f"Document not found: {doc_id} in index {index}"}
@@ -552,7 +574,7 @@ class ElasticsearchServer:
         url = f"{self.base_url}/{index}/_mapping"
         
         try:
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
             
             if response.status_code != 200:
                 return {
@@ -577,7 +599,7 @@ class ElasticsearchServer:
         url = f"{self.base_url}/_cluster/health"
         
         try:
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
             
             if response.status_code != 200:
                 return {
@@ -630,7 +652,7 @@ class ElasticsearchServer:
         url = f"{self.base_url}/{index}/_count"
         
         try:
-            response = requests.post(url, json=es_query, timeout=10)
+            response = self.session.post(url, json=es_query, timeout=10)
             
             if response.status_code != 200:
                 return {
@@ -659,7 +681,7 @@ class ElasticsearchServer:
         url = f"{self.base_url}/{index}/_search"
         
         try:
-            response = requests.post(url, json=query_dsl, timeout=30)
+            response = self.session.post(url, json=query_dsl, timeout=30)
             
             if response.status_code != 200:
                 return {
@@ -680,6 +702,22 @@ class ElasticsearchServer:
         except Exception as e:
             return {"error": f"Unexpected error: {str(e)}"}
 
+    def compress_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace a large result with {"_gzip": base64(gzip(result JSON))} if the client accepts it"""
+        if not self.gzip_enabled or not isinstance(response, dict) or "result" not in response:
+            return response
+        payload = json.dumps(response["result"]).encode()
+        if len(payload) <= GZIP_THRESHOLD:
+            return response
+        # Level 1: most of the ratio of the default level at a fraction of the CPU
+        compressor = zlib.compressobj(1, zlib.DEFLATED, 31)
+        packed = compressor.compress(payload) + compressor.flush()
+        return {
+            "jsonrpc": "2.0",
+            "id": response.get("id"),
+            "result": {"_gzip": base64.b64encode(packed).decode("ascii")}
+        }
+
     def error_response(self, request_id: int, code: int, message: str) -> Dict[str, Any]:
         """Generate error response"""
         return {
@@ -707,7 +745,21 @@ class ElasticsearchServer:
                 
                 try:
                     request = json.loads(line.strip())
-                    response = await self.handle_request(request)
+                    if isinstance(request, list):
+                        # JSON-RPC batch: answer every call in one response array
+                        response = [
+                            await self.handle_request(item) if isinstance(item, dict)
+                            else self.error_response(None, -32600, "Invalid Request")
+                            for item in request
+                        ] or self.error_response(None, -32600, "Invalid Request: empty batch")
+                    elif isinstance(request, dict):
+                        response = await self.handle_request(request)
+                    else:
+                        response = self.error_response(None, -32600, "Invalid Request")
+                    if isinstance(response, list):
+                        response = [self.compress_response(item) for item in response]
+                    else:
+                        response = self.compress_response(response)
                     
                     # Write response to stdout
                     print(json.dumps(response), flush=True)
@@ -4,15 +4,30 @@ llm_interface.py - Interface for communicating with Qwen3 via Ollama
 import json
 import requests
 import re
+from dataclasses import dataclass, field
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timezone
 
+@dataclass(slots=True)
+class AnalysisContext:
+    """State of one analysis session, updated on every iteration"""
+    user_query: str
+    iteration: int = 0
+    tool_results: List[Dict[str, Any]] = field(default_factory=list)
+    analysis_complete: bool = False
+
 class LLMInterface:
     """Interface for Qwen3 LLM communication"""
     
-    def __init__(self, ollama_url: str = "http://localhost:11434/api/chat", model: str = "qwen3:8b"):
+    def __init__(self, ollama_url: str = "http://localhost:11434/api/chat", model: str = "qwen3:8b",
+                 embed_model: str = "nomic-embed-text", session: Optional[requests.Session] = None):
         self.ollama_url = ollama_url
+        # Keep-alive connection to Ollama shared by every chat and embedding call
+        self.http = session if session is not None else requests.Session()
         self.model = model
+        self.embed_model = embed_model
+        self.embed_url = ollama_url.rsplit("/api/", 1)[0] + "/api/embed"
+        self.generate_url = ollama_url.rsplit("/api/", 1)[0] + "/api/generate"
         zulu_time = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
         
         # System message defining The Warden's persona and capabilities
@@ -28,19 +43,37 @@ CURRENT ZULU TIME: {zulu_time}
 
 AVAILABLE DECISION MODES:
 - "use_tool": Execute a specific tool with arguments
+- "use_tools": Execute several independent tools at once (e.g. AbuseIPDB and ThreatFox for the same IP)
 - "complete": Finish analysis and provide final report
 
 When deciding what to do next, respond with a JSON object containing:
 {{
-    "action": "use_tool" | "complete",
+    "action": "use_tool" | "use_tools" | "complete",
     "reasoning": "Brief explanation of why you're taking this action",
     "tool_name": "name_of_tool_to_use" (only if action is "use_tool"),
-    "arguments": {{"arg1": "value1"}} (only if action is "use_tool")
+    "arguments": {{"arg1": "value1"}} (only if action is "use_tool"),
+    "calls": [{{"tool_name": "name_of_tool", "arguments": {{"arg1": "value1"}}}}] (only if action is "use_tools"),
+    "confidence": 0.0-1.0 (how sure you are that the evidence so far supports a final assessment),
+    "final_report": "the complete SOC analyst report" (only if action is "complete" and confidence >= 0.85)
 }}
 
 IMPORTANT: You may include thinking/reasoning in <think></think> tags before your JSON response, but the final response must contain a valid JSON object. The JSON should be the last part of your response.
 
 Always think like a SOC analyst - be thorough, consider multiple threat vectors, and provide actionable intelligence.""".format(zulu_time=zulu_time)
+        
+        # How long Ollama keeps the model (and the KV cache of the shared prompt prefix) resident
+        self.keep_alive = "30m"
+        # Characters kept per tool result in the per-iteration prompt
+        self.result_preview_chars = 512
+
+    def build_system_prompt(self, available_tools: List[Dict[str, str]]) -> str:
+        """System message plus the tool list: a static prefix Ollama can reuse across calls"""
+        prompt = self.system_message + "\n\nAVAILABLE TOOLS:"
+        for tool in available_tools:
+            prompt += f"\n- {tool['name']}: {tool.get('description', 'No description')}"
+            if 'server' in tool:
+                prompt += f" (via {tool['server']})"
+        return prompt
 
     def _call_llm(self, messages: List[Dict[str, str]]) -> Optional[str]:
         """Make a call to the LLM via Ollama"""
@@ -48,13 +81,14 @@ Always think like a SOC analyst - be thorough, consider multiple threat vectors,
             "model": self.model,
             "messages": messages,
             "stream": False,
+            "keep_alive": self.keep_alive,
             "options": {
                 "temperature": 0.1
             }
         }
 
         try:
-            response = requests.post(self.ollama_url, json=payload, timeout=300)
+            response = self.http.post(self.ollama_url, json=payload, timeout=300)
             response.raise_for_status()
             return response.json()["message"]["content"].strip()
         except requests.exceptions.RequestException as e:
@@ -64,14 +98,43 @@ Always think like a SOC analyst - be thorough, consider multiple threat vectors,
             print(f"[LLM] Unexpected response format: missing key {e}")
             return None
     
-    def get_next_action(self, analysis_context: Dict[str, Any], available_tools: List[Dict[str, str]]) -> Optional[Dict[str, Any]]:
-        """Ask Qwen3 what action to take next in the analysis"""
+    def warmup(self) -> bool:
+        """Load the model into memory ahead of the first query (empty prompt, no generation)"""
+        try:
+            response = self.http.post(self.generate_url, json={"model": self.model, "prompt": "", "keep_alive": self.keep_alive},
+                                      timeout=300)
+            response.raise_for_status()
+            print(f"[LLM] {self.model} loaded and warm")
+            return True
+        except requests.exceptions.RequestException as e:
+            print(f"[LLM] Could not pre-load {self.model}: {e}")
+            return False
+    
+    def embed(self, text: str) -> Optional[List[float]]:
+        """Embed text with the local Ollama embedding model"""
+        try:
+            response = self.http.post(self.embed_url, json={"model": self.embed_model, "input": text}, timeout=30)
+            response.raise_for_status()
+            return response.json()["embeddings"][0]
+        except (requests.exceptions.RequestException, KeyError, IndexError, ValueError) as e:
+            print(f"[LLM] Embedding unavailable ({self.embed_model}): {e}")
+            return None
+    
+    def get_next_action(self, analysis_context: AnalysisContext, available_tools: List[Dict[str, str]],
+                        system: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Ask Qwen3 what action to take next in the analysis
+        
+        system is the prebuilt build_system_prompt() prefix; keeping it identical
+        between calls lets Ollama reuse its KV cache so only the suffix is computed.
+        """
+        if system is None:
+            system = self.build_system_prompt(available_tools)
         
         # Build context for the LLM
         context_prompt = self._build_context_prompt(analysis_context, available_tools)
         
         messages = [
-            {"role": "system", "content": self.system_message},
+            {"role": "system", "content": system},
             {"role": "user", "content": context_prompt}
         ]
         
@@ -150,27 +213,26 @@ Always think like a SOC analyst - be thorough, consider multiple threat vectors,
             print(f"[LLM] Unexpected error parsing response: {e}")
             return None
     
-    def _build_context_prompt(self, analysis_context: Dict[str, Any], available_tools: List[Dict[str, str]]) -> str:
-        """Build the context prompt for the LLM"""
+    def _build_context_prompt(self, analysis_context: AnalysisContext, available_tools: List[Dict[str, str]]) -> str:
+        """Build the per-iteration context prompt (tools live in the system prefix)"""
         prompt = f"""ANALYSIS SESSION CONTEXT:
 
-USER QUERY: {analysis_context['user_query']}
-CURRENT ITERATION: {analysis_context['iteration']}
-MAX ITERATIONS: 5
-
-AVAILABLE TOOLS:"""
-        
-        for tool in available_tools:
-            prompt += f"\n- {tool['name']}: {tool.get('description', 'No description')}"
-            if 'server' in tool:
-                prompt += f" (via {tool['server']})"
+USER QUERY: {analysis_context.user_query}
+CURRENT ITERATION: {analysis_context.iteration}
+MAX ITERATIONS: 5"""
         
-        if analysis_context['tool_results']:
+        if analysis_context.tool_results:
             prompt += "\n\nPREVIOUS TOOL RESULTS:"
-            for result in analysis_context['tool_results']:
+            seen = set()
+            for result in analysis_context.tool_results:
+                arguments = json.dumps(result['arguments'], sort_keys=True)
+                # The same call repeated in a later iteration adds nothing new
+                if (result['tool'], arguments) in seen:
+                    continue
+                seen.add((result['tool'], arguments))
                 prompt += f"\n\nTool: {result['tool']}"
-                prompt += f"\nArguments: {json.dumps(result['arguments'])}"
-                prompt += f"\nResult: {json.dumps(result['result'])[:500]}..."  # Truncate long results
+                prompt += f"\nArguments: {arguments}"
+                prompt += f"\nResult: {json.dumps(result['result'])[:self.result_preview_chars]}..."  # Truncate long results
         
         prompt += """
 
@@ -183,17 +245,17 @@ Respond with a JSON decision object."""
         
         return prompt
     
-    def generate_final_analysis(self, analysis_context: Dict[str, Any]) -> str:
+    def generate_final_analysis(self, analysis_context: AnalysisContext, system: Optional[str] = None) -> str:
         """Generate the final analysis report"""
         
         prompt = f"""FINAL ANALYSIS REQUEST:
 
-USER QUERY: {analysis_context['user_query']}
+USER QUERY: {analysis_context.user_query}
 
 INVESTIGATION RESULTS:"""
         
-        if analysis_context['tool_results']:
-            for i, result in enumerate(analysis_context['tool_results'], 1):
+        if analysis_context.tool_results:
+            for i, result in enumerate(analysis_context.tool_results, 1):
                 prompt += f"\n\n{i}. Tool: {result['tool']}"
                 prompt += f"\n   Arguments: {json.dumps(result['arguments'])}"
                 prompt += f"\n   Result: {json.dumps(result['result'])}"
@@ -218,7 +280,7 @@ As The Warden, provide a comprehensive SOC analyst report including:
 Format your response as a professional security report."""
         
         messages = [
-            {"role": "system", "content": self.system_message},
+            {"role": "system", "content": system or self.system_message},
             {"role": "user", "content": prompt}
         ]
         
@@ -1,84 +1,180 @@
 """
 mcp_manager.py - Manages MCP server connections and communication
 """
+import base64
 import json
+import orjson
+import zlib
 import subprocess
 import os
+import fcntl
+import hashlib
+import itertools
+import select
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional
 
+# Buffer size for the stdio pipes to each MCP server
+PIPE_BUFFER_SIZE = 65536
+
+# On-disk cache of tools/list results so restarts can skip the discovery round-trip
+TOOL_CACHE_FILE = os.path.expanduser("~/.cache/warden/mcp_tools.json")
+
+def _read_tool_cache() -> Dict[str, Any]:
+    """Read the tool cache under a shared lock"""
+    try:
+        with open(TOOL_CACHE_FILE, 'rb') as f:
+            fcntl.flock(f, fcntl.LOCK_SH)
+            try:
+                data = f.read()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return orjson.loads(data) if data else {}
+    except (OSError, orjson.JSONDecodeError):
+        return {}
+
+def _write_tool_cache(key: str, entry: Dict[str, Any]):
+    """Merge one entry into the tool cache under an exclusive lock"""
+    try:
+        os.makedirs(os.path.dirname(TOOL_CACHE_FILE), exist_ok=True)
+        with open(TOOL_CACHE_FILE, 'a+b') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                data = f.read()
+                try:
+                    cache = orjson.loads(data) if data else {}
+                except orjson.JSONDecodeError:
+                    cache = {}
+                cache[key] = entry
+                f.seek(0)
+                f.truncate()
+                f.write(orjson.dumps(cache))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+    except OSError as e:
+        print(f"[MCP] Could not write tool cache: {e}")
+
 class MCPServer:
     """Represents a single MCP server connection"""
     
-    def __init__(self, name: str, config: Dict[str, Any]):
+    def __init__(self, name: str, config: Dict[str, Any], base_env: Optional[Dict[str, str]] = None):
         self.name = name
         self.config = config
+        # Read-only environment snapshot shared by all servers of a manager
+        self.base_env = base_env if base_env is not None else dict(os.environ)
         self.process = None
         self.tools = []
         self.is_connected = False
+        self.server_info = None
+        self.capabilities = {}
+        # Warm start from the tool cache: the process is spawned on the first tool call
+        self.lazy_start = config.get('lazy_start', True)
+        self._lazy = False
+        self._start_lock = threading.Lock()
+        # JSON-RPC request ids; next() on a count is atomic in CPython so ids stay unique across threads
+        self._id_counter = itertools.count(1)
+        # Last stderr lines from the server, filled by a background drain thread
+        self._stderr_tail = deque(maxlen=200)
+        self._stderr_thread = None
         self.startup_timeout = config.get('startup_timeout', 3.0)  # Allow configurable startup time
         
+        # Back-pressure: at most max_inflight callers may be queued on this server's pipe
+        self.max_inflight = config.get('max_inflight', 64)
+        self._inflight = threading.Semaphore(self.max_inflight)
+        # The stdio pipe carries one request/response exchange at a time
+        self._io_lock = threading.Lock()
+        # Reused for every outgoing frame instead of allocating request + b'\n'
+        self._write_buffer = bytearray()
+        # Bytes read from stdout but not yet split into response lines
+        self._read_buffer = bytearray()
+        
     def start(self) -> bool:
-        """Start the MCP server process"""
+        """Start the MCP server, or mark it ready from the tool cache without spawning it"""
+        cached = _read_tool_cache().get(self._cache_key()) if self.lazy_start else None
+        if cached and 'tools' in cached:
+            self.server_info = (cached.get('name'), cached.get('version'))
+            self.capabilities = cached.get('capabilities', {})
+            self.tools = cached['tools']
+            for tool in self.tools:
+                tool['server'] = self.name
+            self.is_connected = True
+            self._lazy = True
+            print(f"[MCP] {self.name} ready from cache ({len(self.tools)} tools); process starts on first tool call")
+            return True
+        return self._spawn()
+    
+    def _ensure_started(self) -> bool:
+        """Spawn and initialize a lazily started server (once, even with concurrent callers)"""
+        with self._start_lock:
+            if self._lazy:
+                # Stay lazy and connected until the spawn finishes, so concurrent
+                # callers queue on the lock instead of seeing a disconnected server
+                print(f"[MCP] First call to {self.name}, starting process...")
+                # No blind startup sleep here: it would land on this tool call. A server
+                # that dies is caught by poll() or by the initialize request's timeout
+                started = self._spawn(settle=False)
+                self._lazy = False
+                if not started:
+                    self.is_connected = False
+        return self.is_connected
+    
+    def is_ready(self) -> bool:
+        """is_connected, after waiting out a first-call spawn running on another thread"""
+        with self._start_lock:
+            return self.is_connected
+    
+    def _spawn(self, settle: bool = True) -> bool:
+        """Start the MCP server process and run the initialize handshake"""
         try:
-            cmd = [self.config['command']] + self.config.get('args', [])
-            env = os.environ.copy()
-            
-            # Note: MCP servers use dotenv to load API keys from .env file
-            # The env config here is mainly for other environment variables
-            config_env = self.config.get('env', {})
-            if config_env:
-                env.update(config_env)
-                print(f"[MCP] Additional env vars for {self.name}: {list(config_env.keys())}")
-            
-            print(f"[MCP] Starting {self.name} with command: {' '.join(cmd)}")
-            print(f"[MCP] Note: {self.name} will load API keys from .env file via dotenv")
-            
-            self.process = subprocess.Popen(
-                cmd,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-                env=env
-            )
-            
-            # Give the process a moment to start and load .env
-            time.sleep(self.startup_timeout)
-            
-            # Check if process is still running
-            if self.process.poll() is not None:
-                stderr_output = self.process.stderr.read() if self.process.stderr else "No stderr output"
-                print(f"[MCP] {self.name} process exited early. Error: {stderr_output}")
+            if not self._launch_process(settle):
                 return False
             
             # Initialize the server (matching test_mcp.py)
             init_request = {
                 "jsonrpc": "2.0",
-                "id": 1,
+                "id": next(self._id_counter),
                 "method": "initialize",
-                "params": {"protocolVersion": "2024-11-05"}
+                "params": {
+                    "protocolVersion": "2024-11-05",
+                    # Servers that understand it gzip large results as {"_gzip": base64}
+                    "clientInfo": {"name": "the-warden", "accept-encoding": "gzip"}
+                }
             }
             
-            response = self._send_request(init_request)
+            # Without cached tools, piggyback tools/list on the handshake as one
+            # JSON-RPC batch: one pipe round trip instead of two
+            tools_response = None
+            if self._cache_key() in _read_tool_cache():
+                response = self._send_request(init_request)
+            else:
+                response, tools_response = self._initialize_batched(init_request)
+            
             if response and 'result' in response:
                 server_info = response.get('result', {}).get('serverInfo', {})
                 server_name = server_info.get('name', 'Unknown')
                 server_version = server_info.get('version', 'Unknown')
                 print(f"[MCP] {self.name} initialized as '{server_name}' v{server_version}")
                 self.is_connected = True
-                self._load_tools()
+                self.server_info = (server_name, server_version)
+                self.capabilities = response.get('result', {}).get('capabilities', {})
+                if tools_response is not None:
+                    self._apply_tools(tools_response)
+                elif not self._load_cached_tools():
+                    self._load_tools()
                 return True
             else:
                 print(f"[MCP] Failed to initialize {self.name} - no valid response")
                 if response:
                     print(f"[MCP] Response was: {response}")
                 # Check stderr for any error messages
-                if self.process.stderr:
-                    stderr_line = self.process.stderr.readline()
-                    if stderr_line:
-                        print(f"[MCP] Stderr: {stderr_line.strip()}")
+                stderr_output = self._stderr_text()
+                if stderr_output:
+                    print(f"[MCP] Stderr: {stderr_output}")
                 
         except FileNotFoundError:
             print(f"[MCP] Command not found for {self.name}: {self.config['command']}")
@@ -87,43 +183,202 @@ class MCPServer:
             
         return False
     
-    def _send_request(self, request: Dict[str, Any], timeout: float = 10.0) -> Optional[Dict[str, Any]]:
-        """Send a JSON-RPC request to the server with timeout handling"""
+    def _launch_process(self, settle: bool = True) -> bool:
+        """Start the server process; False if it has already exited.
+        
+        settle waits startup_timeout first so a server that fails while loading is
+        reported here. Raises FileNotFoundError when the command does not exist.
+        """
+        cmd = [self.config['command']] + self.config.get('args', [])
+
+        # Note: MCP servers use dotenv to load API keys from .env file
+        # The env config here is mainly for other environment variables
+        config_env = self.config.get('env', {})
+        env = self.base_env if not config_env else {**self.base_env, **config_env}
+        if config_env:
+            print(f"[MCP] Additional env vars for {self.name}: {list(config_env.keys())}")
+        
+        print(f"[MCP] Starting {self.name} with command: {' '.join(cmd)}")
+        print(f"[MCP] Note: {self.name} will load API keys from .env file via dotenv")
+        
+        # 64 KiB pipe buffers: a large tools/call result is pulled in a few
+        # big reads and readline() finds each frame's newline with memchr
+        self.process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=env,
+            bufsize=PIPE_BUFFER_SIZE
+        )
+        
+        # Keep stderr drained so a chatty server never blocks on a full pipe
+        self._stderr_tail.clear()
+        self._read_buffer.clear()
+        self._stderr_thread = threading.Thread(target=self._drain_stderr, name=f"{self.name}-stderr", daemon=True)
+        self._stderr_thread.start()
+        
+        # Give the process a moment to start and load .env
+        if settle:
+            time.sleep(self.startup_timeout)
+        
+        # Check if process is still running
+        if self.process.poll() is not None:
+            self._stderr_thread.join(timeout=1.0)
+            stderr_output = self._stderr_text() or "No stderr output"
+            print(f"[MCP] {self.name} process exited early. Error: {stderr_output}")
+            return False
+        return True
+    
+    def _initialize_batched(self, init_request: Dict[str, Any]):
+        """Send initialize + tools/list as one batch; returns (init_response, tools_response).
+        
+        Servers that reject batches (non-array reply, e.g. -32600) get the plain
+        initialize instead, and tools_response is None so tools load separately.
+        """
+        tools_request = {
+            "jsonrpc": "2.0",
+            "id": next(self._id_counter),
+            "method": "tools/list"
+        }
+        responses = self._send_request([init_request, tools_request])
+        if not isinstance(responses, list):
+            print(f"[MCP] {self.name} does not accept batched requests, falling back to sequential handshake")
+            # A server that chokes on the array may have exited; start a fresh process for the retry
+            if self.process.poll() is not None:
+                print(f"[MCP] {self.name} exited on the batch, restarting it")
+                if not self._launch_process():
+                    return None, None
+            return self._send_request(init_request), None
+        
+        by_id = {r.get('id'): r for r in responses if isinstance(r, dict)}
+        return by_id.get(init_request['id']), by_id.get(tools_request['id'])
+    
+    def _drain_stderr(self):
+        """Continuously read the server's stderr into a bounded tail buffer"""
+        try:
+            for line in iter(self.process.stderr.readline, b''):
+                self._stderr_tail.append(line)
+        except (OSError, ValueError):
+            pass  # Pipe closed during shutdown
+    
+    def _stderr_text(self) -> str:
+        """Recent stderr output as text"""
+        return b''.join(self._stderr_tail).decode(errors='replace').strip()
+    
+    def _send_request(self, request: Any, timeout: float = 10.0) -> Optional[Any]:
+        """Send a JSON-RPC request to the server with timeout and back-pressure handling"""
         if not self.process:
             return None
-            
+        
+        # One deadline covers queueing, the pipe lock and the reply, so timeout is the caller's total wait
+        deadline = time.monotonic() + timeout
+        if not self._inflight.acquire(timeout=timeout):
+            print(f"[MCP] {self.name} is busy ({self.max_inflight} requests in flight)")
+            return self._busy_response(request)
+        try:
+            if not self._io_lock.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                print(f"[MCP] Timeout waiting for {self.name} to finish the previous request")
+                return self._busy_response(request)
+            try:
+                return self._exchange(request, deadline)
+            finally:
+                self._io_lock.release()
+        finally:
+            self._inflight.release()
+    
+    def _busy_response(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Synthetic JSON-RPC error returned when the server cannot take the request"""
+        return {
+            "jsonrpc": "2.0",
+            "id": request.get('id') if isinstance(request, dict) else None,
+            "error": {
+                "code": -32000,
+                "message": f"Server {self.name} is busy, try again later"
+            }
+        }
+    
+    @staticmethod
+    def _answers(request: Any, response: Any) -> bool:
+        """Whether response is the reply to request rather than a late reply to an earlier one.
+        
+        An id of null is accepted: servers use it for parse errors and rejected batches.
+        """
+        if isinstance(request, list):
+            if isinstance(response, list):
+                ids = {item.get('id') for item in request}
+                return any(isinstance(item, dict) and item.get('id') in ids for item in response)
+            return isinstance(response, dict) and response.get('id') is None
+        return isinstance(response, dict) and response.get('id') in (request.get('id'), None)
+    
+    def _read_line(self, deadline: float) -> Optional[bytes]:
+        """Next newline-terminated frame from stdout; b'' at EOF, None on timeout.
+        
+        Reads go through our own buffer so select() never waits on a pipe whose
+        next line is already sitting in a userspace buffer.
+        """
+        buffer = self._read_buffer
+        fd = self.process.stdout.fileno()
+        scanned = 0
+        while True:
+            end = buffer.find(b'\n', scanned)
+            if end >= 0:
+                line = bytes(buffer[:end + 1])
+                del buffer[:end + 1]
+                return line
+            scanned = len(buffer)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                return None
+            chunk = os.read(fd, PIPE_BUFFER_SIZE)
+            if not chunk:
+                return b''
+            buffer += chunk
+    
+    def _exchange(self, request: Any, deadline: float) -> Optional[Any]:
+        """Write one request frame (a request or a batch array) and read its response line.
+        
+        Lines whose id does not match (replies to requests that already timed out)
+        are discarded so they cannot be taken as the answer to this request.
+        """
         try:
-            # Send request (matching test_mcp.py format)
-            request_json = json.dumps(request) + '\n'
-            self.process.stdin.write(request_json)
+            # Send request (matching test_mcp.py format); pipes are binary so
+            # orjson's bytes go straight to the process without re-encoding
+            buffer = self._write_buffer
+            buffer.clear()
+            buffer += orjson.dumps(request)
+            buffer += b'\n'
+            self.process.stdin.write(buffer)
             self.process.stdin.flush()
             
-            # Read response with timeout handling
-            import select
-            import sys
-            
-            # Use select for non-blocking read with timeout (Unix-like systems)
-            if hasattr(select, 'select'):
-                ready, _, _ = select.select([self.process.stdout], [], [], timeout)
-                if not ready:
+            # Read response lines until the one answering this request or the deadline
+            while True:
+                response_line = self._read_line(deadline)
+                if response_line is None:
                     print(f"[MCP] Timeout waiting for response from {self.name}")
                     return None
-            
-            response_line = self.process.stdout.readline()
-            if response_line:
-                response = json.loads(response_line.strip())
-                
-                # Check for JSON-RPC errors
-                if 'error' in response:
-                    error_info = response['error']
-                    print(f"[MCP] JSON-RPC error from {self.name}: {error_info.get('message', 'Unknown error')} (Code: {error_info.get('code', 'Unknown')})")
+                if not response_line:
+                    print(f"[MCP] No response from {self.name}")
+                    return None
                 
-                return response
+                response = orjson.loads(response_line)
+                if self._answers(request, response):
+                    break
+                print(f"[MCP] Discarding stale response from {self.name}")
+            
+            if isinstance(response, list):
+                response = [self._decompress(item) for item in response]
             else:
-                print(f"[MCP] No response from {self.name}")
-                return None
+                response = self._decompress(response)
+            
+            # Check for JSON-RPC errors
+            if isinstance(response, dict) and 'error' in response:
+                error_info = response['error']
+                print(f"[MCP] JSON-RPC error from {self.name}: {error_info.get('message', 'Unknown error')} (Code: {error_info.get('code', 'Unknown')})")
+            
+            return response
                 
-        except json.JSONDecodeError as e:
+        except (orjson.JSONDecodeError, json.JSONDecodeError) as e:
             print(f"[MCP] Invalid JSON response from {self.name}: {e}")
             print(f"[MCP] Raw response: {response_line if 'response_line' in locals() else 'None'}")
             return None
@@ -131,33 +386,73 @@ class MCPServer:
             print(f"[MCP] Communication error with {self.name}: {e}")
             return None
     
+    @staticmethod
+    def _decompress(response: Any) -> Any:
+        """Expand a {"result": {"_gzip": ...}} response back into its plain result"""
+        if isinstance(response, dict):
+            result = response.get('result')
+            if isinstance(result, dict) and '_gzip' in result:
+                packed = base64.b64decode(result['_gzip'])
+                response['result'] = orjson.loads(zlib.decompress(packed, 31))
+        return response
+    
     def _load_tools(self):
         """Load available tools from the server"""
         tools_request = {
             "jsonrpc": "2.0",
-            "id": 2,
+            "id": next(self._id_counter),
             "method": "tools/list"
         }
         
-        response = self._send_request(tools_request)
+        self._apply_tools(self._send_request(tools_request))
+    
+    def _apply_tools(self, response: Optional[Dict[str, Any]]):
+        """Store the tools from a tools/list response and refresh the tool cache"""
         if response and 'result' in response:
             self.tools = response['result'].get('tools', [])
             # Add server name to each tool for identification
             for tool in self.tools:
                 tool['server'] = self.name
             print(f"[MCP] Loaded {len(self.tools)} tools from {self.name}")
+            if self.server_info:
+                name, version = self.server_info
+                _write_tool_cache(self._cache_key(), {'name': name, 'version': version,
+                                                      'capabilities': self.capabilities, 'tools': self.tools})
         else:
             print(f"[MCP] Failed to load tools from {self.name}")
     
+    def _cache_key(self) -> str:
+        """Tool cache key derived from the launch command, its env and the server scripts' mtimes"""
+        args = self.config.get('args', [])
+        # Editing a server script changes its mtime and so invalidates its cached tools
+        mtimes = [os.stat(arg).st_mtime_ns if os.path.isfile(arg) else None for arg in args]
+        launch = json.dumps([self.config['command'], args, self.config.get('env', {}), mtimes], sort_keys=True)
+        return hashlib.sha256(launch.encode()).hexdigest()
+    
+    def _load_cached_tools(self) -> bool:
+        """Reuse cached tools if the server reports the same name and version"""
+        cached = _read_tool_cache().get(self._cache_key())
+        if not cached or (cached.get('name'), cached.get('version')) != self.server_info:
+            return False
+        
+        self.tools = cached.get('tools', [])
+        for tool in self.tools:
+            tool['server'] = self.name
+        print(f"[MCP] Loaded {len(self.tools)} cached tools for {self.name}")
+        return True
+    
     def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Call a specific tool on this server"""
+        if self._lazy and not self._ensure_started():
+            print(f"[MCP] Server {self.name} failed to start")
+            return None
         if not self.is_connected:
             print(f"[MCP] Server {self.name} is not connected")
             return None
             
         tool_request = {
             "jsonrpc": "2.0",
-            "id": int(time.time() * 1000),  # Use milliseconds for better uniqueness
+            "id": next(self._id_counter),
             "method": "tools/call",
             "params": {
                 "name": tool_name,
@@ -187,9 +482,14 @@ class MCPServer:
                 self.process.kill()
             self.process = None
             self.is_connected = False
+        elif self._lazy:
+            self._lazy = False
+            self.is_connected = False
     
     def health_check(self) -> bool:
         """Check if the server is still responsive"""
+        if self._lazy:
+            return True  # Not spawned yet; it starts on its first tool call
         if not self.process or not self.is_connected:
             return False
             
@@ -208,13 +508,15 @@ class MCPManager:
         self.servers = {}
         self.config_file = config_file
         self.client_settings = {}
+        self._base_env = dict(os.environ)  # Snapshot once, shared by every server start
+        self.tool_to_server: Dict[str, MCPServer] = {}
         self._load_config()
     
     def _load_config(self):
         """Load MCP server configuration"""
         try:
-            with open(self.config_file, 'r') as f:
-                config = json.load(f)
+            with open(self.config_file, 'rb') as f:
+                config = orjson.loads(f.read())
                 
             # Load client settings
             self.client_settings = config.get('clientSettings', {})
@@ -225,13 +527,13 @@ class MCPManager:
                 if 'startup_timeout' not in server_config and 'timeout' in self.client_settings:
                     server_config['startup_timeout'] = self.client_settings['timeout'] / 1000.0  # Convert ms to seconds
                     
-                self.servers[server_name] = MCPServer(server_name, server_config)
+                self.servers[server_name] = MCPServer(server_name, server_config, self._base_env)
                 print(f"[MCP] Configured server: {server_name} - {server_config.get('description', 'No description')}")
                 
         except FileNotFoundError:
             print(f"[MCP] Config file {self.config_file} not found")
             raise
-        except json.JSONDecodeError as e:
+        except (orjson.JSONDecodeError, json.JSONDecodeError) as e:
             print(f"[MCP] Invalid JSON in config file: {e}")
             raise
     
@@ -242,13 +544,32 @@ class MCPManager:
         success_count = 0
         total_tools = 0
         
-        for server_name, server in self.servers.items():
+        # Spawn + handshake every server concurrently: startup costs the slowest
+        # server's time rather than the sum of all of them
+        def start_one(item):
+            server_name, server = item
             print(f"[MCP] Starting {server_name}...")
-            if server.start():
+            try:
+                return server.start()
+            except Exception as e:
+                print(f"[MCP] {server_name} raised during startup: {e}")
+                return False
+        
+        if self.servers:
+            with ThreadPoolExecutor(max_workers=len(self.servers), thread_name_prefix="mcp-start") as pool:
+                results = list(pool.map(start_one, self.servers.items()))
+        else:
+            results = []
+        
+        self.tool_to_server = {}
+        for (server_name, server), started in zip(self.servers.items(), results):
+            if started:
                 tool_count = len(server.tools)
                 print(f"[MCP] {server_name} online ({tool_count} tools)")
                 success_count += 1
                 total_tools += tool_count
+                for tool in server.tools:
+                    self.tool_to_server.setdefault(tool.get('name'), server)
             else:
                 print(f"[MCP] {server_name} failed to start")
         
@@ -275,8 +596,11 @@ class MCPManager:
     
     def get_server_for_tool(self, tool_name: str) -> Optional[MCPServer]:
         """Find which server has a specific tool"""
+        server = self.tool_to_server.get(tool_name)
+        if server is not None and server.is_ready():
+            return server
         for server in self.servers.values():
-            if server.is_connected:
+            if server.is_ready():
                 for tool in server.tools:
                     if tool.get('name') == tool_name:
                         return server
@@ -4,15 +4,21 @@ Elasticsearch Security Logs Generator
 Simulates security events across VPN, authentication, system info, and server monitoring
 """
 
-import json
-import random
+import argparse
 import datetime
-import uuid
 import requests
-import time
+import socket
 import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from typing import Dict, List, Tuple
 
+import numpy as np
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
 # Constants
 ELASTICSEARCH_URL = "http://192.168.1.222:5000"
 INDEX1 = "logs-signins"
@@ -21,6 +27,41 @@ INDEX3 = "logs-sysinfo"
 INDEX4 = "logs-prdservers"
 INDEX5 = "logs-devicelogs"
 
+class TunedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled sockets disable Nagle and enable TCP keep-alive."""
+    
+    SOCKET_OPTIONS = (
+        (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    )
+    
+    def init_poolmanager(self, *args, **kwargs):
+        options = list(HTTPConnection.default_socket_options)
+        options += [opt for opt in self.SOCKET_OPTIONS if opt not in options]
+        kwargs["socket_options"] = options
+        super().init_poolmanager(*args, **kwargs)
+
+# Concurrent bulk requests; the connection pool, worker pool and in-flight cap are all sized
+# from this so no worker ever waits on a pooled connection. ~3x cores is enough to saturate a default node
+BULK_CONCURRENCY = 16
+
+# Shared Elasticsearch session so bulk requests reuse pooled connections
+SESSION = requests.Session()
+_ADAPTER = TunedHTTPAdapter(pool_connections=8, pool_maxsize=BULK_CONCURRENCY)
+SESSION.mount("http://", _ADAPTER)
+SESSION.mount("https://", _ADAPTER)
+
+# Bulk loads run in parallel so ES can use its indexing thread pool
+_EXEC = ThreadPoolExecutor(max_workers=BULK_CONCURRENCY, thread_name_prefix="es-bulk")
+
+# Records buffered per index before a bulk request is sent mid-run
+BULK_FLUSH_RECORDS = 1000
+
+# Upper bound on bulk requests queued or in flight, so generation can run
+# ahead of ES without buffering unbounded batches
+MAX_INFLIGHT_BULKS = BULK_CONCURRENCY
+_INFLIGHT = threading.BoundedSemaphore(MAX_INFLIGHT_BULKS)
+
 # Malicious IP addresses from abuseIPdb
 MALICIOUS_IPS = [
     "175.152.32.105", "82.157.190.174", "202.39.251.216", "167.94.146.49",
@@ -58,57 +99,161 @@ CITIES_COUNTRIES = [
     ("Mumbai", "IN", "MH", "400001"), ("São Paulo", "BR", "SP", "01310-100")
 ]
 
-OPERATING_SYSTEMS = ["Windows 11", "Windows 10", "macOS Sonoma", "Ubuntu 22.04", "CentOS 8", "Red Hat 9"]
-DEVICE_TYPES = ["Laptop", "Desktop", "Mobile", "Tablet"]
-BROWSERS = ["Chrome", "Firefox", "Safari", "Edge"]
-VPN_PROTOCOLS = ["OpenVPN", "IKEv2", "WireGuard", "L2TP"]
+OPERATING_SYSTEMS = ("Windows 11", "Windows 10", "macOS Sonoma", "Ubuntu 22.04", "CentOS 8", "Red Hat 9")
+DEVICE_TYPES = ("Laptop", "Desktop", "Mobile", "Tablet")
+BROWSERS = ("Chrome", "Firefox", "Safari", "Edge")
+VPN_PROTOCOLS = ("OpenVPN", "IKEv2", "WireGuard", "L2TP")
+VPN_SERVERS = tuple(f"vpn-{region}-{n}.company.com" for region in ("us", "eu", "asia") for n in range(1, 11))
 
-MALICIOUS_PROCESSES = [
+MALICIOUS_PROCESSES = (
     "mimikatz.exe", "psexec.exe", "nc.exe", "powershell -enc", "cmd.exe /c whoami",
     "net user administrator", "reg add HKLM", "schtasks /create", "wmic process",
     "netsh advfirewall", "vssadmin delete shadows", "bcdedit /set", "certutil -urlcache"
-]
+)
 
-NORMAL_PROCESSES = [
+NORMAL_PROCESSES = (
     "explorer.exe", "chrome.exe", "firefox.exe", "notepad.exe", "outlook.exe",
     "teams.exe", "slack.exe", "code.exe", "python.exe", "java.exe", "docker.exe",
     "kubectl", "git.exe", "npm.exe", "node.exe", "ssh.exe"
-]
+)
 
-SUSPICIOUS_COMMANDS = [
+SUSPICIOUS_COMMANDS = (
     "sudo su -", "chmod 777", "rm -rf /", "cat /etc/passwd", "history -c",
     "unset HISTFILE", "nohup", "base64 -d", "curl | sh", "wget -O-"
-]
+)
+
+SIGNIN_SERVICES = ("VPN", "Office365", "AWS Console", "Azure Portal", "Internal App")
+AUTH_METHODS = ("Password", "MFA", "SSO", "Certificate")
+SIGNIN_BROWSERS = ("Chrome/91.0", "Firefox/89.0", "Safari/14.1", "Edge/91.0")
+SIGNIN_PLATFORMS = ("Windows NT 10.0", "Macintosh", "X11; Linux x86_64")
+# Full user-agent strings built once instead of formatted per record
+SIGNIN_USER_AGENTS = tuple(f"Mozilla/5.0 ({platform}) AppleWebKit/537.36" for platform in SIGNIN_PLATFORMS)
+PRD_SERVERS = ("prd-web-01", "prd-db-01", "prd-api-01", "prd-cache-01", "prd-queue-01")
+LOGIN_METHODS = ("SSH", "RDP", "Console", "Web Terminal")
+DEVICE_ACTIONS = ("start", "stop", "create", "modify", "delete", "network_connect")
+
+RNG = np.random.default_rng()
+
+# Decimal strings for every octet value, so formatting an IP is lookups rather than int->str conversions
+_OCTET = tuple(map(str, range(256)))
+
+def generate_ips_bulk(n: int) -> List[str]:
+    """Generate n random public IP addresses with one vectorized draw."""
+    o = _OCTET
+    octets = RNG.integers([1, 1, 1, 1], [224, 256, 256, 256], size=(n, 4))
+    return [f"{o[a]}.{o[b]}.{o[c]}.{o[d]}" for a, b, c, d in octets.tolist()]
+
+_INTERNAL_NETWORKS = ("192.168", "10.0", "172.16")
+
+def generate_internal_ips_bulk(n: int) -> List[str]:
+    """Generate n random internal IP addresses with one vectorized draw."""
+    networks = RNG.integers(0, len(_INTERNAL_NETWORKS), size=n).tolist()
+    octets = RNG.integers([1, 1], [256, 255], size=(n, 2)).tolist()
+    return [f"{_INTERNAL_NETWORKS[net]}.{_OCTET[c]}.{_OCTET[d]}" for net, (c, d) in zip(networks, octets)]
+
+def generate_macs_bulk(n: int) -> List[str]:
+    """Generate n random MAC addresses by hex-formatting one block of random bytes."""
+    raw = RNG.bytes(6 * n)
+    return [raw[i:i + 6].hex(":") for i in range(0, 6 * n, 6)]
+
+@dataclass
+class RandomPool:
+    """Batch of pre-drawn uniforms consumed in order by the log builders.
+    
+    One vectorized numpy draw per batch replaces a Python-level random.* call
+    for every field of every record.
+    """
+    size: int = 8192
+    uniforms: List[float] = field(default_factory=list, repr=False)
+    cursor: int = 0
+    # Random bytes for ids and hashes, fetched with one os.urandom call per batch
+    byte_batch: int = 16 * 256
+    random_bytes: bytes = field(default=b"", repr=False)
+    byte_cursor: int = 0
+    # Addresses pre-generated in bulk, keyed by generator
+    address_batch: int = 1024
+    addresses: Dict[str, List[str]] = field(default_factory=dict, repr=False)
+    
+    def next(self) -> float:
+        """Next uniform in [0, 1), refilling the batch when exhausted."""
+        if self.cursor >= len(self.uniforms):
+            self.uniforms = RNG.random(self.size).tolist()
+            self.cursor = 0
+        value = self.uniforms[self.cursor]
+        self.cursor += 1
+        return value
+    
+    def choice(self, seq):
+        """Pick an element of seq (random.choice equivalent)."""
+        return seq[int(self.next() * len(seq))]
+    
+    def randint(self, low: int, high: int) -> int:
+        """Integer in [low, high] inclusive (random.randint equivalent)."""
+        return low + int(self.next() * (high - low + 1))
+    
+    def uniform(self, low: float, high: float) -> float:
+        """Float in [low, high) (random.uniform equivalent)."""
+        return low + (high - low) * self.next()
+    
+    def token_bytes(self, n: int) -> bytes:
+        """Next n random bytes from the pre-fetched batch."""
+        if self.byte_cursor + n > len(self.random_bytes):
+            self.random_bytes = os.urandom(max(n, self.byte_batch))
+            self.byte_cursor = 0
+        chunk = self.random_bytes[self.byte_cursor:self.byte_cursor + n]
+        self.byte_cursor += n
+        return chunk
+    
+    def random_id(self) -> str:
+        """Random id in uuid4's 8-4-4-4-12 hex layout, without building a UUID object."""
+        h = self.token_bytes(16).hex()
+        return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+    
+    def address(self, generate_bulk) -> str:
+        """Next address from a batch made by generate_bulk(n), refilling when exhausted."""
+        batch = self.addresses.get(generate_bulk.__name__)
+        if not batch:
+            batch = self.addresses[generate_bulk.__name__] = generate_bulk(self.address_batch)
+        return batch.pop()
+
+POOL = RandomPool()
+
+# Share of sessions simulated as malicious
+MALICIOUS_RATE = 0.01
 
-def is_malicious():
-    """Determines if a log is malicious based on a 1% chance."""
-    return random.randint(1, 100) > 50
+def malicious_mask(n: int, rate: float = MALICIOUS_RATE) -> np.ndarray:
+    """Decide n sessions at once: a boolean array that is True with the given rate."""
+    return RNG.random(n) < rate
 
-def generate_ip():
+def generate_ip(pool: RandomPool = POOL):
     """Generate a random public IP address."""
-    return f"{random.randint(1, 223)}.{random.randint(1, 255)}.{random.randint(1, 255)}.{random.randint(1, 255)}"
+    return pool.address(generate_ips_bulk)
 
-def generate_internal_ip():
+def generate_internal_ip(pool: RandomPool = POOL):
     """Generate a random internal IP address."""
-    networks = ["192.168", "10.0", "172.16"]
-    network = random.choice(networks)
-    return f"{network}.{random.randint(1, 255)}.{random.randint(1, 254)}"
+    return pool.address(generate_internal_ips_bulk)
 
-def generate_mac_address():
+def generate_mac_address(pool: RandomPool = POOL):
     """Generate a random MAC address."""
-    return ":".join([f"{random.randint(0, 255):02x}" for _ in range(6)])
+    return pool.address(generate_macs_bulk)
 
-def get_timestamp_sequence(base_time=None):
+# Prebuilt timedeltas indexed by whole seconds, so offsets are list lookups
+# instead of a new timedelta per event (covers 4 steps x 60s and 60 minutes back)
+_SECONDS_TD = [datetime.timedelta(seconds=sec) for sec in range(3601)]
+_STEP_MULTIPLIERS = np.arange(5)
+
+def timestamp_offsets(n: int) -> List[List[int]]:
+    """Draw n rows of 5 cumulative event offsets (seconds) with one vectorized call."""
+    return (RNG.integers(1, 61, size=(n, 5)) * _STEP_MULTIPLIERS).tolist()  # 1-60 seconds apart
+
+def get_timestamp_sequence(base_time=None, pool: RandomPool = POOL, offsets: List[int] = None):
     """Generate a sequence of timestamps for correlated events."""
     if base_time is None:
         base_time = datetime.datetime.now()
+    if offsets is None:
+        offsets = [i * pool.randint(1, 60) for i in range(5)]  # 5 different log types
     
-    timestamps = []
-    for i in range(5):  # 5 different log types
-        offset = random.randint(1, 60)  # 1-60 seconds apart
-        timestamps.append(base_time + datetime.timedelta(seconds=i * offset))
-    
-    return timestamps
+    return [base_time + _SECONDS_TD[offset] for offset in offsets]
 
 def create_elasticsearch_indices():
     """Create Elasticsearch indices with explicit mappings."""
@@ -248,47 +393,39 @@ def create_elasticsearch_indices():
     
     for index_name, mapping in indices:
         try:
-            # Check if index exists
-            check_response = requests.head(f"{ELASTICSEARCH_URL}/{index_name}")
-            
-            if check_response.status_code == 200:
-                print(f"⚡ Index {index_name} already exists, skipping creation")
-                continue
-            
-            # Create index with mapping (only if it doesn't exist)
-            response = requests.put(f"{ELASTICSEARCH_URL}/{index_name}", 
-                                  json=mapping, 
-                                  headers={'Content-Type': 'application/json'})
+            # Create index with mapping; ES rejects it with resource_already_exists_exception
+            # if the index is already there, so no separate HEAD round trip is needed
+            response = SESSION.put(f"{ELASTICSEARCH_URL}/{index_name}", 
+                                 data=orjson.dumps(mapping), 
+                                 headers={'Content-Type': 'application/json'})
             
             if response.status_code in [200, 201]:
                 print(f"✓ Created index: {index_name}")
+            elif response.status_code == 400 and b"resource_already_exists_exception" in response.content:
+                print(f"⚡ Index {index_name} already exists, skipping creation")
             else:
                 print(f"✗ Failed to create index {index_name}: {response.text}")
                 
         except Exception as e:
             print(f"✗ Error creating index {index_name}: {e}")
 
-def createSigninData(employee: Dict, timestamp: datetime.datetime, correlation_id: str, malicious: bool = False) -> Dict:
+def createSigninData(employee: Dict, timestamp: datetime.datetime, correlation_id: str, malicious: bool = False, pool: RandomPool = POOL) -> Dict:
     """Generate signin log data."""
     
-    services = ["VPN", "Office365", "AWS Console", "Azure Portal", "Internal App"]
-    auth_methods = ["Password", "MFA", "SSO", "Certificate"]
-    browsers = ["Chrome/91.0", "Firefox/89.0", "Safari/14.1", "Edge/91.0"]
-    
     if malicious:
         # Malicious signin patterns
-        status = random.choice(["failed", "failed", "failed", "success"])  # Multiple failures then success
-        source_ip = random.choice(MALICIOUS_IPS)
-        risk_score = random.randint(80, 100)
+        status = pool.choice(("failed", "failed", "failed", "success"))  # Multiple failures then success
+        source_ip = pool.choice(MALICIOUS_IPS)
+        risk_score = pool.randint(80, 100)
         mfa_status = "bypassed" if status == "success" else "failed"
-        failure_reason = random.choice([
+        failure_reason = pool.choice((
             "Invalid password", "Account locked", "MFA timeout", 
             "Suspicious location", "Too many attempts"
-        ]) if status == "failed" else None
+        )) if status == "failed" else None
     else:
-        status = random.choice(["success", "success", "success", "failed"])  # Mostly successful
-        source_ip = generate_ip()
-        risk_score = random.randint(1, 30)
+        status = pool.choice(("success", "success", "success", "failed"))  # Mostly successful
+        source_ip = generate_ip(pool)
+        risk_score = pool.randint(1, 30)
         mfa_status = "success" if status == "success" else "failed"
         failure_reason = "Invalid password" if status == "failed" else None
     
@@ -298,199 +435,408 @@ def createSigninData(employee: Dict, timestamp: datetime.datetime, correlation_i
         "full_name": employee["full_name"],
         "department": employee["department"],
         "role": employee["role"],
-        "service": random.choice(services),
-        "authentication_method": random.choice(auth_methods),
+        "service": pool.choice(SIGNIN_SERVICES),
+        "authentication_method": pool.choice(AUTH_METHODS),
         "mfa_status": mfa_status,
         "status": status,
         "source_ip": source_ip,
-        "user_agent": f"Mozilla/5.0 ({random.choice(['Windows NT 10.0', 'Macintosh', 'X11; Linux x86_64'])}) AppleWebKit/537.36",
-        "browser": random.choice(browsers),
-        "session_id": str(uuid.uuid4()),
+        "user_agent": pool.choice(SIGNIN_USER_AGENTS),
+        "browser": pool.choice(SIGNIN_BROWSERS),
+        "session_id": pool.random_id(),
         "correlation_id": correlation_id,
         "risk_score": risk_score,
         "failure_reason": failure_reason,
         "is_malicious": malicious
     }
 
-def createVpnData(employee: Dict, timestamp: datetime.datetime, correlation_id: str, malicious: bool = False) -> Dict:
+def createVpnData(employee: Dict, timestamp: datetime.datetime, correlation_id: str, malicious: bool = False, pool: RandomPool = POOL) -> Dict:
     """Generate VPN log data."""
     
     if malicious:
-        external_ip = random.choice(MALICIOUS_IPS)
-        city, country, state, zip_code = random.choice([
+        external_ip = pool.choice(MALICIOUS_IPS)
+        city, country, state, zip_code = pool.choice((
             ("Unknown", "CN", "Unknown", "000000"),
             ("Tor Exit", "XX", "Unknown", "000000"),
             ("Moscow", "RU", "MOW", "101000")
-        ])
+        ))
         status = "success"  # Successful after multiple attempts
-        session_duration = random.randint(3600, 7200)  # Long sessions
+        session_duration = pool.randint(3600, 7200)  # Long sessions
     else:
-        external_ip = generate_ip()
-        city, country, state, zip_code = random.choice(CITIES_COUNTRIES)
-        status = random.choice(["success", "success", "success", "failed"])
-        session_duration = random.randint(300, 3600)
+        external_ip = generate_ip(pool)
+        city, country, state, zip_code = pool.choice(CITIES_COUNTRIES)
+        status = pool.choice(("success", "success", "success", "failed"))
+        session_duration = pool.randint(300, 3600)
     
     return {
         "@timestamp": timestamp.isoformat(),
         "username": employee["username"],
         "external_ip": external_ip,
-        "internal_ip": generate_internal_ip(),
+        "internal_ip": generate_internal_ip(pool),
         "city": city,
         "country": country,
         "state": state,
         "zip_code": zip_code,
-        "latitude": round(random.uniform(-90, 90), 6),
-        "longitude": round(random.uniform(-180, 180), 6),
-        "vpn_protocol": random.choice(VPN_PROTOCOLS),
-        "vpn_server": f"vpn-{random.choice(['us', 'eu', 'asia'])}-{random.randint(1, 10)}.company.com",
+        "latitude": round(pool.uniform(-90, 90), 6),
+        "longitude": round(pool.uniform(-180, 180), 6),
+        "vpn_protocol": pool.choice(VPN_PROTOCOLS),
+        "vpn_server": pool.choice(VPN_SERVERS),
         "status": status,
-        "bytes_sent": random.randint(1000000, 100000000),
-        "bytes_received": random.randint(5000000, 500000000),
+        "bytes_sent": pool.randint(1000000, 100000000),
+        "bytes_received": pool.randint(5000000, 500000000),
         "session_duration": session_duration,
         "correlation_id": correlation_id,
         "is_malicious": malicious
     }
 
-def createSysInfoData(employee: Dict, timestamp: datetime.datetime, correlation_id: str, malicious: bool = False) -> Dict:
+def createSysInfoData(employee: Dict, timestamp: datetime.datetime, correlation_id: str, malicious: bool = False, pool: RandomPool = POOL) -> Dict:
     """Generate system info log data."""
     
     if malicious:
-        operating_system = random.choice(["Windows 7", "Unknown OS", "Linux Custom"])
+        operating_system = pool.choice(("Windows 7", "Unknown OS", "Linux Custom"))
         compliance_status = "non-compliant"
         antivirus_status = "disabled"
     else:
-        operating_system = random.choice(OPERATING_SYSTEMS)
-        compliance_status = random.choice(["compliant", "compliant", "non-compliant"])
-        antivirus_status = random.choice(["active", "active", "disabled"])
+        operating_system = pool.choice(OPERATING_SYSTEMS)
+        compliance_status = pool.choice(("compliant", "compliant", "non-compliant"))
+        antivirus_status = pool.choice(("active", "active", "disabled"))
     
+    ts_iso = timestamp.isoformat()  # Shared by @timestamp and last_seen
     return {
-        "@timestamp": timestamp.isoformat(),
+        "@timestamp": ts_iso,
         "username": employee["username"],
-        "device_id": str(uuid.uuid4()),
-        "mac_address": generate_mac_address(),
-        "ip_address": generate_ip(),
-        "internal_ip": generate_internal_ip(),
+        "device_id": pool.random_id(),
+        "mac_address": generate_mac_address(pool),
+        "ip_address": generate_ip(pool),
+        "internal_ip": generate_internal_ip(pool),
         "operating_system": operating_system,
-        "device_type": random.choice(DEVICE_TYPES),
-        "device_name": f"{employee['username']}-{random.choice(['laptop', 'desktop', 'mobile'])}",
-        "browser": random.choice(BROWSERS),
-        "browser_version": f"{random.randint(90, 120)}.0.{random.randint(1000, 9999)}.{random.randint(100, 999)}",
-        "screen_resolution": random.choice(["1920x1080", "2560x1440", "3840x2160", "1366x768"]),
-        "timezone": random.choice(["UTC-5", "UTC+0", "UTC+9", "UTC-8"]),
-        "last_seen": timestamp.isoformat(),
+        "device_type": pool.choice(DEVICE_TYPES),
+        "device_name": f"{employee['username']}-{pool.choice(('laptop', 'desktop', 'mobile'))}",
+        "browser": pool.choice(BROWSERS),
+        "browser_version": f"{pool.randint(90, 120)}.0.{pool.randint(1000, 9999)}.{pool.randint(100, 999)}",
+        "screen_resolution": pool.choice(("1920x1080", "2560x1440", "3840x2160", "1366x768")),
+        "timezone": pool.choice(("UTC-5", "UTC+0", "UTC+9", "UTC-8")),
+        "last_seen": ts_iso,
         "compliance_status": compliance_status,
         "antivirus_status": antivirus_status,
         "correlation_id": correlation_id,
         "is_malicious": malicious
     }
 
-def createPrdServersData(employee: Dict, timestamp: datetime.datetime, correlation_id: str, malicious: bool = False) -> Dict:
+def createPrdServersData(employee: Dict, timestamp: datetime.datetime, correlation_id: str, malicious: bool = False, pool: RandomPool = POOL) -> Dict:
     """Generate production server log data."""
     
-    servers = ["prd-web-01", "prd-db-01", "prd-api-01", "prd-cache-01", "prd-queue-01"]
-    login_methods = ["SSH", "RDP", "Console", "Web Terminal"]
-    
     if malicious:
-        processes_running = random.choice(MALICIOUS_PROCESSES)
-        commands_executed = random.choice(SUSPICIOUS_COMMANDS)
+        processes_running = pool.choice(MALICIOUS_PROCESSES)
+        commands_executed = pool.choice(SUSPICIOUS_COMMANDS)
         privilege_level = "administrator"
-        cpu_usage = random.uniform(80, 100)
-        session_duration = random.randint(7200, 14400)  # Long sessions
+        cpu_usage = pool.uniform(80, 100)
+        session_duration = pool.randint(7200, 14400)  # Long sessions
     else:
-        processes_running = random.choice(NORMAL_PROCESSES)
-        commands_executed = random.choice(["ls -la", "ps aux", "top", "df -h", "netstat -an"])
-        privilege_level = random.choice(["user", "user", "administrator"])
-        cpu_usage = random.uniform(5, 50)
-        session_duration = random.randint(600, 3600)
+        processes_running = pool.choice(NORMAL_PROCESSES)
+        commands_executed = pool.choice(("ls -la", "ps aux", "top", "df -h", "netstat -an"))
+        privilege_level = pool.choice(("user", "user", "administrator"))
+        cpu_usage = pool.uniform(5, 50)
+        session_duration = pool.randint(600, 3600)
     
+    ts_iso = timestamp.isoformat()  # Shared by @timestamp and login_time
     return {
-        "@timestamp": timestamp.isoformat(),
+        "@timestamp": ts_iso,
         "username": employee["username"],
-        "server_name": random.choice(servers),
-        "server_ip": generate_internal_ip(),
-        "login_time": timestamp.isoformat(),
+        "server_name": pool.choice(PRD_SERVERS),
+        "server_ip": generate_internal_ip(pool),
+        "login_time": ts_iso,
         "session_duration": session_duration,
-        "login_method": random.choice(login_methods),
+        "login_method": pool.choice(LOGIN_METHODS),
         "processes_running": processes_running,
         "cpu_usage": round(cpu_usage, 2),
-        "memory_usage": round(random.uniform(10, 80), 2),
-        "disk_usage": round(random.uniform(20, 90), 2),
-        "network_connections": random.randint(5, 50),
+        "memory_usage": round(pool.uniform(10, 80), 2),
+        "disk_usage": round(pool.uniform(20, 90), 2),
+        "network_connections": pool.randint(5, 50),
         "privilege_level": privilege_level,
         "commands_executed": commands_executed,
         "correlation_id": correlation_id,
         "is_malicious": malicious
     }
 
-def createDeviceLogsData(timestamp: datetime.datetime, correlation_id: str, malicious: bool = False) -> Dict:
+def createDeviceLogsData(timestamp: datetime.datetime, correlation_id: str, malicious: bool = False, pool: RandomPool = POOL) -> Dict:
     """Generate device monitoring log data."""
     
-    servers = ["prd-web-01", "prd-db-01", "prd-api-01", "prd-cache-01", "prd-queue-01"]
-    actions = ["start", "stop", "create", "modify", "delete", "network_connect"]
-    
     if malicious:
-        process_name = random.choice(MALICIOUS_PROCESSES)
-        command_line = random.choice([
+        process_name = pool.choice(MALICIOUS_PROCESSES)
+        command_line = pool.choice((
             "powershell.exe -ExecutionPolicy Bypass -WindowStyle Hidden",
             "cmd.exe /c echo malicious > temp.txt",
             "nc.exe -l -p 4444 -e cmd.exe",
             "mimikatz.exe sekurlsa::logonpasswords"
-        ])
+        ))
         signature_status = "unsigned"
         user = "SYSTEM"
     else:
-        process_name = random.choice(NORMAL_PROCESSES)
+        process_name = pool.choice(NORMAL_PROCESSES)
         command_line = f"{process_name} --config /etc/config.conf"
-        signature_status = random.choice(["signed", "signed", "unsigned"])
-        user = random.choice(EMPLOYEES)["username"]
+        signature_status = pool.choice(("signed", "signed", "unsigned"))
+        user = pool.choice(EMPLOYEES)["username"]
     
     return {
         "@timestamp": timestamp.isoformat(),
-        "server_name": random.choice(servers),
-        "server_ip": generate_internal_ip(),
+        "server_name": pool.choice(PRD_SERVERS),
+        "server_ip": generate_internal_ip(pool),
         "process_name": process_name,
-        "process_id": random.randint(1000, 99999),
-        "parent_process_id": random.randint(100, 9999),
+        "process_id": pool.randint(1000, 99999),
+        "parent_process_id": pool.randint(100, 9999),
         "user": user,
-        "action": random.choice(actions),
+        "action": pool.choice(DEVICE_ACTIONS),
         "command_line": command_line,
         "file_path": f"/opt/app/{process_name}",
-        "registry_key": f"HKLM\\SOFTWARE\\Company\\{process_name}" if "Windows" in random.choice(OPERATING_SYSTEMS) else None,
-        "network_connection": f"{generate_internal_ip()}:443" if random.choice([True, False]) else None,
-        "hash": f"sha256:{uuid.uuid4().hex}",
+        "registry_key": f"HKLM\\SOFTWARE\\Company\\{process_name}" if "Windows" in pool.choice(OPERATING_SYSTEMS) else None,
+        "network_connection": f"{generate_internal_ip(pool)}:443" if pool.choice((True, False)) else None,
+        "hash": f"sha256:{pool.token_bytes(32).hex()}",
         "signature_status": signature_status,
         "correlation_id": correlation_id,
         "is_malicious": malicious
     }
 
+# Category tables shared by the columnar (SoA) signin generator
+SIGNIN_FAILURE_REASONS = ("Invalid password", "Account locked", "MFA timeout", "Suspicious location", "Too many attempts")
+MALICIOUS_IPS_PACKED = np.array(
+    [int.from_bytes(socket.inet_aton(ip), "big") for ip in MALICIOUS_IPS], dtype=np.uint32
+)
+
+def format_ipv4(packed: np.ndarray) -> List[str]:
+    """Render packed uint32 IPv4 addresses as dotted-quad strings."""
+    o = _OCTET
+    octets = (packed[:, None] >> np.array([24, 16, 8, 0], dtype=np.uint32)) & 0xFF
+    return [f"{o[a]}.{o[b]}.{o[c]}.{o[d]}" for a, b, c, d in octets.tolist()]
+
+def _format_ids(raw: np.ndarray) -> List[str]:
+    """Render (n, 16) uint8 rows in uuid4's 8-4-4-4-12 hex layout."""
+    hexed = raw.tobytes().hex()
+    return [
+        f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+        for h in (hexed[i:i + 32] for i in range(0, len(hexed), 32))
+    ]
+
+def generate_signins_columnar(n: int, malicious_rate: float = MALICIOUS_RATE, now: datetime.datetime = None) -> Dict[str, np.ndarray]:
+    """Generate n signin events as one numpy array per field (SoA) instead of n dicts.
+    
+    Categorical fields are stored as small-int indices into the constant tables,
+    IPs as packed uint32 and ids as raw bytes; columnar_signins_to_records turns
+    the result into the same dicts createSigninData builds.
+    """
+    if now is None:
+        now = datetime.datetime.now()
+    
+    malicious = malicious_mask(n, malicious_rate)
+    # Benign sessions mostly succeed, malicious ones mostly fail
+    success = RNG.random(n) < np.where(malicious, 0.25, 0.75)
+    
+    public_ips = RNG.integers([1, 1, 1, 1], [224, 256, 256, 256], size=(n, 4), dtype=np.uint32)
+    public_ips = (public_ips[:, 0] << 24) | (public_ips[:, 1] << 16) | (public_ips[:, 2] << 8) | public_ips[:, 3]
+    known_bad = MALICIOUS_IPS_PACKED[RNG.integers(0, len(MALICIOUS_IPS_PACKED), size=n)]
+    
+    offsets = RNG.integers(1, 3601, size=n).astype("timedelta64[s]")
+    
+    return {
+        "@timestamp": np.datetime64(now, "us") - offsets,
+        "employee_idx": RNG.integers(0, len(EMPLOYEES), size=n, dtype=np.int32),
+        "service_idx": RNG.integers(0, len(SIGNIN_SERVICES), size=n, dtype=np.int8),
+        "auth_method_idx": RNG.integers(0, len(AUTH_METHODS), size=n, dtype=np.int8),
+        "platform_idx": RNG.integers(0, len(SIGNIN_PLATFORMS), size=n, dtype=np.int8),
+        "browser_idx": RNG.integers(0, len(SIGNIN_BROWSERS), size=n, dtype=np.int8),
+        "failure_idx": RNG.integers(0, len(SIGNIN_FAILURE_REASONS), size=n, dtype=np.int8),
+        "success": success,
+        "source_ip": np.where(malicious, known_bad, public_ips).astype(np.uint32),
+        "risk_score": RNG.integers(np.where(malicious, 80, 1), np.where(malicious, 101, 31)).astype(np.int16),
+        "session_id": RNG.integers(0, 256, size=(n, 16), dtype=np.uint8),
+        "correlation_id": RNG.integers(0, 256, size=(n, 16), dtype=np.uint8),
+        "is_malicious": malicious,
+    }
+
+def columnar_signins_to_records(columns: Dict[str, np.ndarray]) -> List[Dict]:
+    """Transpose generate_signins_columnar output (SoA) into signin dicts (AoS) for JSON emit."""
+    timestamps = np.datetime_as_string(columns["@timestamp"], unit="us").tolist()
+    source_ips = format_ipv4(columns["source_ip"])
+    session_ids = _format_ids(columns["session_id"])
+    correlation_ids = _format_ids(columns["correlation_id"])
+    
+    records = []
+    for i, (emp, svc, auth, plat, brw, fail, ok, risk, mal) in enumerate(zip(
+            columns["employee_idx"].tolist(), columns["service_idx"].tolist(),
+            columns["auth_method_idx"].tolist(), columns["platform_idx"].tolist(),
+            columns["browser_idx"].tolist(), columns["failure_idx"].tolist(),
+            columns["success"].tolist(), columns["risk_score"].tolist(),
+            columns["is_malicious"].tolist())):
+        employee = EMPLOYEES[emp]
+        if ok:
+            mfa_status, failure_reason = ("bypassed" if mal else "success"), None
+        else:
+            mfa_status = "failed"
+            failure_reason = SIGNIN_FAILURE_REASONS[fail] if mal else "Invalid password"
+        records.append({
+            "@timestamp": timestamps[i],
+            "username": employee["username"],
+            "full_name": employee["full_name"],
+            "department": employee["department"],
+            "role": employee["role"],
+            "service": SIGNIN_SERVICES[svc],
+            "authentication_method": AUTH_METHODS[auth],
+            "mfa_status": mfa_status,
+            "status": "success" if ok else "failed",
+            "source_ip": source_ips[i],
+            "user_agent": SIGNIN_USER_AGENTS[plat],
+            "browser": SIGNIN_BROWSERS[brw],
+            "session_id": session_ids[i],
+            "correlation_id": correlation_ids[i],
+            "risk_score": risk,
+            "failure_reason": failure_reason,
+            "is_malicious": mal
+        })
+    return records
+
+# Dictionaries for the columnar signin fields that are derived rather than drawn
+SIGNIN_MFA_STATUSES = ("success", "bypassed", "failed")
+SIGNIN_STATUSES = ("failed", "success")
+
+def columnar_signins_to_arrow(columns: Dict[str, np.ndarray]):
+    """Build a pyarrow Table straight from generate_signins_columnar output, without per-record dicts.
+    
+    Index columns become dictionary arrays over the constant tables, so the
+    Parquet writer gets the dictionary encoding without hashing any strings.
+    """
+    import pyarrow as pa  # only needed for --format parquet
+    
+    def categorical(indices, table, mask=None):
+        return pa.DictionaryArray.from_arrays(pa.array(indices, mask=mask), pa.array(table))
+    
+    employees = columns["employee_idx"]
+    success = columns["success"]
+    malicious = columns["is_malicious"]
+    # Same rules as columnar_signins_to_records: failure_reason is null on success and
+    # "Invalid password" (index 0) for every benign failure
+    mfa_idx = np.where(success, malicious.astype(np.int8), 2)
+    failure_idx = np.where(malicious, columns["failure_idx"], 0)
+    
+    arrays = {
+        "@timestamp": pa.array(np.datetime_as_string(columns["@timestamp"], unit="us")),
+        "username": categorical(employees, [e["username"] for e in EMPLOYEES]),
+        "full_name": categorical(employees, [e["full_name"] for e in EMPLOYEES]),
+        "department": categorical(employees, [e["department"] for e in EMPLOYEES]),
+        "role": categorical(employees, [e["role"] for e in EMPLOYEES]),
+        "service": categorical(columns["service_idx"], SIGNIN_SERVICES),
+        "authentication_method": categorical(columns["auth_method_idx"], AUTH_METHODS),
+        "mfa_status": categorical(mfa_idx, SIGNIN_MFA_STATUSES),
+        "status": categorical(success.astype(np.int8), SIGNIN_STATUSES),
+        "source_ip": pa.array(format_ipv4(columns["source_ip"])),
+        "user_agent": categorical(columns["platform_idx"], SIGNIN_USER_AGENTS),
+        "browser": categorical(columns["browser_idx"], SIGNIN_BROWSERS),
+        "session_id": pa.array(_format_ids(columns["session_id"])),
+        "correlation_id": pa.array(_format_ids(columns["correlation_id"])),
+        "risk_score": pa.array(columns["risk_score"]),
+        "failure_reason": categorical(failure_idx, SIGNIN_FAILURE_REASONS, mask=success),
+        "is_malicious": pa.array(malicious),
+    }
+    return pa.Table.from_arrays(list(arrays.values()), names=list(arrays))
+
 def save_to_jsonl(data: List[Dict], filename: str):
     """Save data to JSON Lines format."""
     os.makedirs("logs", exist_ok=True)
     filepath = f"logs/{filename}"
     
-    with open(filepath, 'w') as f:
+    with open(filepath, 'wb') as f:
         for record in data:
-            f.write(json.dumps(record) + '\n')
+            f.write(orjson.dumps(record) + b'\n')
     
     print(f"✓ Saved {len(data)} records to {filepath}")
 
+def save_to_msgpack(data: List[Dict], filename: str):
+    """Save data as a stream of concatenated MessagePack records."""
+    import msgpack  # only needed for --format msgpack
+    
+    os.makedirs("logs", exist_ok=True)
+    filepath = f"logs/{filename}"
+    
+    packer = msgpack.Packer(use_bin_type=True)
+    with open(filepath, 'wb') as f:
+        for record in data:
+            f.write(packer.pack(record))
+    
+    print(f"✓ Saved {len(data)} records to {filepath}")
+
+def save_to_jsonl_zst(data: List[Dict], filename: str):
+    """Save data as zstd-compressed JSON Lines (level 3, multi-threaded)."""
+    import zstandard as zstd  # only needed for --format zst
+    
+    os.makedirs("logs", exist_ok=True)
+    filepath = f"logs/{filename}"
+    
+    cctx = zstd.ZstdCompressor(level=3, threads=-1)
+    with open(filepath, 'wb') as f, cctx.stream_writer(f) as z:
+        for record in data:
+            z.write(orjson.dumps(record) + b'\n')
+    
+    print(f"✓ Saved {len(data)} records to {filepath}")
+
+def save_to_parquet(data: List[Dict], filename: str):
+    """Save data as a zstd-compressed, dictionary-encoded Parquet table."""
+    import pyarrow as pa  # only needed for --format parquet
+    
+    # Union of keys so fields only some records carry (e.g. on malicious sessions) are kept
+    names = list(dict.fromkeys(key for record in data for key in record))
+    table = pa.Table.from_arrays([pa.array([record.get(key) for record in data]) for key in names], names=names)
+    write_parquet_table(table, filename)
+
+def write_parquet_table(table, filename: str):
+    """Write a pyarrow Table to logs/ as zstd-compressed, dictionary-encoded Parquet."""
+    import pyarrow.parquet as pq  # only needed for --format parquet
+    
+    os.makedirs("logs", exist_ok=True)
+    filepath = f"logs/{filename}"
+    
+    pq.write_table(table, filepath, compression='zstd', use_dictionary=True)
+    
+    print(f"✓ Saved {table.num_rows} records to {filepath}")
+
+# Offline output formats: --format value -> (file extension, saver)
+OUTPUT_FORMATS = {
+    "jsonl": (".jsonl", save_to_jsonl),
+    "msgpack": (".msgpack", save_to_msgpack),
+    "zst": (".jsonl.zst", save_to_jsonl_zst),
+}
+
+# Columnar formats are written once per index per run rather than per user
+PER_RUN_FORMATS = {
+    "parquet": (".parquet", save_to_parquet),
+}
+
+# The target index is in the bulk URL, so every action line is just an empty index action
+_BULK_ACTION_LINE = orjson.dumps({"index": {}}) + b"\n"
+
+# Bulk body chunk size: with TCP_NODELAY every yielded chunk is its own send(), so records are coalesced
+BULK_CHUNK_SIZE = 64 * 1024
+
+def _ndjson_iter(data: List[Dict]):
+    """Yield the bulk NDJSON body in ~64 KiB chunks of whole action+document pairs."""
+    chunk = bytearray()
+    for record in data:
+        chunk += _BULK_ACTION_LINE
+        chunk += orjson.dumps(record)
+        chunk += b"\n"
+        if len(chunk) >= BULK_CHUNK_SIZE:
+            yield bytes(chunk)
+            chunk.clear()
+    if chunk:
+        yield bytes(chunk)
+
 def send_to_elasticsearch(index: str, data: List[Dict]):
     """Send data to Elasticsearch using bulk API."""
     if not data:
         return
     
-    # Prepare bulk request
-    bulk_data = []
-    for record in data:
-        bulk_data.append(json.dumps({"index": {"_index": index}}))
-        bulk_data.append(json.dumps(record))
-    
-    bulk_body = '\n'.join(bulk_data) + '\n'
-    
     try:
-        response = requests.post(
-            f"{ELASTICSEARCH_URL}/_bulk",
-            data=bulk_body,
+        # Stream the body (chunked transfer) instead of joining one big bytes object
+        response = SESSION.post(
+            f"{ELASTICSEARCH_URL}/{index}/_bulk",
+            data=_ndjson_iter(data),
             headers={'Content-Type': 'application/x-ndjson'}
         )
         
@@ -507,24 +853,55 @@ def send_to_elasticsearch(index: str, data: List[Dict]):
     except Exception as e:
         print(f"✗ Error sending to {index}: {e}")
 
-def simulate_user_activity(external_ip: str = None):
+def _send_and_release(index: str, data: List[Dict]):
+    """Run a bulk send on a worker thread and free its in-flight slot."""
+    try:
+        send_to_elasticsearch(index, data)
+    finally:
+        _INFLIGHT.release()
+
+def flush_bulk(per_index: Dict[str, List[Dict]], min_records: int = 1) -> List[Future]:
+    """Queue a bulk load for every index holding at least min_records buffered logs, then clear it.
+    
+    Returns without waiting so the caller can keep generating while ES ACKs;
+    blocks only once MAX_INFLIGHT_BULKS requests are outstanding.
+    """
+    futures = []
+    for index, logs in per_index.items():
+        if logs and len(logs) >= min_records:
+            _INFLIGHT.acquire()
+            futures.append(_EXEC.submit(_send_and_release, index, logs))
+            per_index[index] = []
+    return futures
+
+def simulate_user_activity(external_ip: str = None, out_format: str = "jsonl"):
     """Simulate a complete user activity flow across all log sources."""
     
+    # One random pool shared by every record generated in this run
+    pool = RandomPool()
+    
+    # Logs for all users are buffered per index and sent in as few bulk requests as possible
+    per_index: Dict[str, List[Dict]] = {INDEX2: [], INDEX1: [], INDEX3: [], INDEX4: [], INDEX5: []}
+    pending: List[Future] = []
+    per_run = out_format in PER_RUN_FORMATS
+    extension, save_logs = (PER_RUN_FORMATS if per_run else OUTPUT_FORMATS)[out_format]
+    run_logs: Dict[str, List[Dict]] = {index: [] for index in per_index}
+    
     # Select 3 random employees
-    selected_employees = random.sample(EMPLOYEES, 3)
+    selected_employees = [EMPLOYEES[i] for i in RNG.choice(len(EMPLOYEES), size=3, replace=False)]
     
-    for employee in selected_employees:
+    # One clock read and one vectorized draw each for offsets and malicious flags
+    now = datetime.datetime.now()
+    batch_offsets = timestamp_offsets(len(selected_employees))
+    batch_malicious = malicious_mask(len(selected_employees)).tolist()
+    
+    for employee, offsets, malicious in zip(selected_employees, batch_offsets, batch_malicious):
         # Generate correlation ID for this user session
-        correlation_id = str(uuid.uuid4())
-        
-        # Determine if this session is malicious
-        malicious = is_malicious()
+        correlation_id = pool.random_id()
         
         # Generate correlated timestamps
-        base_time = datetime.datetime.now() - datetime.timedelta(
-            minutes=random.randint(1, 60)
-        )
-        timestamps = get_timestamp_sequence(base_time)
+        base_time = now - _SECONDS_TD[60 * pool.randint(1, 60)]
+        timestamps = get_timestamp_sequence(base_time, pool, offsets)
         
         print(f"\n{'='*50}")
         print(f"Simulating activity for: {employee['full_name']} ({employee['username']})")
@@ -545,57 +922,99 @@ def simulate_user_activity(external_ip: str = None):
             print("🚨 Simulating brute force attack pattern...")
             
             # Generate 10+ failed attempts before success
-            failed_attempts = random.randint(10, 15)
+            failed_attempts = pool.randint(10, 15)
             
             for attempt in range(failed_attempts):
-                failed_timestamp = base_time - datetime.timedelta(seconds=attempt * 30)
+                failed_timestamp = base_time - _SECONDS_TD[attempt * 30]
                 
                 # Failed VPN attempts
-                failed_vpn = createVpnData(employee, failed_timestamp, correlation_id, True)
+                failed_vpn = createVpnData(employee, failed_timestamp, correlation_id, True, pool=pool)
                 failed_vpn["status"] = "failed"
                 all_logs[INDEX2].append(failed_vpn)
                 
                 # Failed signin attempts
-                failed_signin = createSigninData(employee, failed_timestamp, correlation_id, True)
+                failed_signin = createSigninData(employee, failed_timestamp, correlation_id, True, pool=pool)
                 failed_signin["status"] = "failed"
                 all_logs[INDEX1].append(failed_signin)
         
         # Generate successful login sequence
-        vpn_log = createVpnData(employee, timestamps[0], correlation_id, malicious)
+        vpn_log = createVpnData(employee, timestamps[0], correlation_id, malicious, pool=pool)
         if external_ip:
             vpn_log["external_ip"] = external_ip
         all_logs[INDEX2].append(vpn_log)
         
-        signin_log = createSigninData(employee, timestamps[1], correlation_id, malicious)
+        signin_log = createSigninData(employee, timestamps[1], correlation_id, malicious, pool=pool)
         all_logs[INDEX1].append(signin_log)
         
-        sysinfo_log = createSysInfoData(employee, timestamps[2], correlation_id, malicious)
+        sysinfo_log = createSysInfoData(employee, timestamps[2], correlation_id, malicious, pool=pool)
         all_logs[INDEX3].append(sysinfo_log)
         
-        prd_log = createPrdServersData(employee, timestamps[3], correlation_id, malicious)
+        prd_log = createPrdServersData(employee, timestamps[3], correlation_id, malicious, pool=pool)
         all_logs[INDEX4].append(prd_log)
         
-        device_log = createDeviceLogsData(timestamps[4], correlation_id, malicious)
+        device_log = createDeviceLogsData(timestamps[4], correlation_id, malicious, pool=pool)
         all_logs[INDEX5].append(device_log)
         
-        # Save and send logs for each index
+        # Save logs for each index and buffer them for bulk loading
         for index, logs in all_logs.items():
             if logs:
-                filename = f"{index}_{correlation_id[:8]}.jsonl"
-                save_to_jsonl(logs, filename)
-                send_to_elasticsearch(index, logs)
+                if per_run:
+                    run_logs[index].extend(logs)
+                else:
+                    filename = f"{index}_{correlation_id[:8]}{extension}"
+                    save_logs(logs, filename)
+                per_index[index].extend(logs)
+        
+        # Only send mid-run once an index has a full bulk's worth of records
+        pending += flush_bulk(per_index, BULK_FLUSH_RECORDS)
         
         print(f"✓ Completed simulation for {employee['username']}")
-        time.sleep(1)  # Small delay between users
+    
+    # One bulk request per index for whatever is left, then wait for every ACK
+    pending += flush_bulk(per_index)
+    
+    if per_run:
+        run_id = pool.random_id()[:8]
+        for index, logs in run_logs.items():
+            if logs:
+                save_logs(logs, f"{index}_{run_id}{extension}")
+    
+    wait(pending)
+
+def generate_bulk_signins(n: int, out_format: str = "jsonl"):
+    """Generate n standalone signin events column-wise, save them and bulk-load them."""
+    print(f"\n📦 Generating {n} signin events in columnar form...")
+    columns = generate_signins_columnar(n)
+    records = columnar_signins_to_records(columns)
+    
+    extension, save_logs = {**OUTPUT_FORMATS, **PER_RUN_FORMATS}[out_format]
+    filename = f"{INDEX1}_bulk_{POOL.random_id()[:8]}{extension}"
+    if out_format == "parquet":
+        # Parquet is columnar already, so it is built from the arrays rather than the dicts
+        write_parquet_table(columnar_signins_to_arrow(columns), filename)
+    else:
+        save_logs(records, filename)
+    
+    pending = []
+    for start in range(0, n, BULK_FLUSH_RECORDS):
+        pending += flush_bulk({INDEX1: records[start:start + BULK_FLUSH_RECORDS]})
+    wait(pending)
 
 def main():
     """Main function to orchestrate the logging simulation."""
+    parser = argparse.ArgumentParser(description="Elasticsearch Security Logs Generator")
+    parser.add_argument("--format", choices=sorted({**OUTPUT_FORMATS, **PER_RUN_FORMATS}), default="jsonl",
+                        help="file format for the offline copies written to logs/")
+    parser.add_argument("--bulk-signins", type=int, default=0, metavar="N",
+                        help="also generate N standalone signin events with the columnar generator")
+    args = parser.parse_args()
+    
     print("🚀 Starting Elasticsearch Security Logs Generator")
     print(f"Target Elasticsearch: {ELASTICSEARCH_URL}")
     
     # Test Elasticsearch connection
     try:
-        response = requests.get(ELASTICSEARCH_URL)
+        response = SESSION.get(ELASTICSEARCH_URL)
         if response.status_code == 200:
             cluster_info = response.json()
             print(f"✓ Connected to Elasticsearch cluster: {cluster_info.get('cluster_name')}")
@@ -620,7 +1039,10 @@ def main():
     
     # Start simulation
     print("\n🎭 Starting user activity simulation...")
-    simulate_user_activity(external_ip)
+    simulate_user_activity(external_ip, args.format)
+    
+    if args.bulk_signins > 0:
+        generate_bulk_signins(args.bulk_signins, args.format)
     
     print(f"\n🎉 Simulation complete! Check your Elasticsearch indices:")
     for index in [INDEX1, INDEX2, INDEX3, INDEX4, INDEX5]:
@@ -0,0 +1,118 @@
+"""
+semantic_cache.py - Reuse final reports for near-duplicate analysis queries
+"""
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import time
+from array import array
+from typing import List, Optional
+
+DEFAULT_CACHE_DB = os.path.expanduser("~/.cache/warden/semantic_cache.db")
+
+try:
+    # google-re2 matches in linear time (DFA, no backtracking), which matters
+    # when an analyst pastes a large log excerpt into the query
+    import re2 as _regex
+except ImportError:
+    _regex = re
+
+# Indicators that must match exactly: a paraphrase about a different IP or hash
+# can embed almost identically, so similarity alone is never enough.
+# One alternation so the query is scanned once regardless of indicator type.
+IOC_PATTERN = _regex.compile(r"(?i)\b(?:\d{1,3}\.){3}\d{1,3}\b|\b[a-f0-9]{32,64}\b|\b(?:[a-z0-9-]+\.)+[a-z]{2,}\b")
+
+def extract_iocs(text: str) -> str:
+    """Canonical, order-independent key of the indicators mentioned in text"""
+    return ",".join(sorted({match.lower() for match in IOC_PATTERN.findall(text)}))
+
+def _normalize(vector: List[float]) -> array:
+    """Unit-length float32 copy so cosine similarity is a plain dot product"""
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return array('f', (x / norm for x in vector))
+
+class SemanticCache:
+    """SQLite-backed cache of (query embedding -> final report) lookups"""
+
+    def __init__(self, db_path: str = DEFAULT_CACHE_DB, threshold: float = 0.92,
+                 ttl: float = 3600.0, max_entries: int = 1000):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.namespace = ""
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._db = sqlite3.connect(db_path)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS entries (
+                namespace TEXT NOT NULL,
+                iocs TEXT NOT NULL,
+                query TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                report TEXT NOT NULL,
+                ts REAL NOT NULL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_lookup ON entries (namespace, iocs, ts)")
+        self._db.commit()
+
+    def set_namespace(self, *parts: str):
+        """Scope entries to a tool configuration so tool changes invalidate old reports"""
+        self.namespace = hashlib.sha256("\x00".join(parts).encode()).hexdigest()[:16]
+
+    def lookup(self, query: str, embedding: List[float]) -> Optional[str]:
+        """Return the cached report for the most similar fresh query, if similar enough"""
+        target = _normalize(embedding)
+        rows = self._db.execute(
+            "SELECT query, embedding, report FROM entries WHERE namespace = ? AND iocs = ? AND ts >= ?",
+            (self.namespace, extract_iocs(query), time.time() - self.ttl)
+        )
+
+        best_score, best = 0.0, None
+        for cached_query, blob, report in rows:
+            vector = array('f')
+            vector.frombytes(blob)
+            if len(vector) != len(target):
+                continue  # Embedding model changed
+            score = sum(a * b for a, b in zip(target, vector))
+            if score > best_score:
+                best_score, best = score, (cached_query, report)
+
+        if best and best_score >= self.threshold:
+            print(f"[CACHE] Reusing report for similar query '{best[0]}' (similarity {best_score:.3f})")
+            return best[1]
+        return None
+
+    def lookup_ioc(self, query: str) -> Optional[str]:
+        """Most recent fresh report when the query is nothing but a single indicator (no embedding needed)"""
+        iocs = extract_iocs(query)
+        if not iocs or "," in iocs or query.strip().lower() != iocs:
+            return None
+        row = self._db.execute(
+            "SELECT report FROM entries WHERE namespace = ? AND iocs = ? AND ts >= ? ORDER BY ts DESC LIMIT 1",
+            (self.namespace, iocs, time.time() - self.ttl)
+        ).fetchone()
+        if row:
+            print(f"[CACHE] Reusing latest report on {iocs}")
+            return row[0]
+        return None
+
+    def store(self, query: str, embedding: List[float], report: str):
+        """Insert a finished report and drop expired or excess entries"""
+        now = time.time()
+        self._db.execute(
+            "INSERT INTO entries (namespace, iocs, query, embedding, report, ts) VALUES (?, ?, ?, ?, ?, ?)",
+            (self.namespace, extract_iocs(query), query, _normalize(embedding).tobytes(), report, now)
+        )
+        self._db.execute("DELETE FROM entries WHERE ts < ?", (now - self.ttl,))
+        self._db.execute(
+            "DELETE FROM entries WHERE rowid NOT IN (SELECT rowid FROM entries ORDER BY ts DESC LIMIT ?)",
+            (self.max_entries,)
+        )
+        self._db.commit()
+
+    def close(self):
+        """Close the underlying database"""
+        self._db.close()
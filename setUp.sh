@@ -1,6 +1,15 @@
 # requirements.txt
 requests>=2.31.0
 python-dotenv>=1.0.0
+orjson>=3.9.0
+numpy>=1.22
+msgpack>=1.0  # Optional: sampleElasticData.py --format msgpack
+zstandard>=0.21  # Optional: sampleElasticData.py --format zst
+pyarrow>=12.0  # Optional: sampleElasticData.py --format parquet
+google-re2>=1.1  # Optional: linear-time IOC extraction in semantic_cache.py
+httpx[http2]>=0.27  # Optional: multiplexed HTTP/2 ThreatFox queries
+fastjsonschema>=2.16  # Optional: compiled tool argument validation in tool_executor.py
+ijson>=3.1  # Optional: incremental ThreatFox parsing in tools/intel_providers.py
 ipaddress  # Built-in for Python 3.3+
 
 # .env file (create this with your API keys)
@@ -3,61 +3,155 @@
 Simple test script for your MCP servers
 Save this as test_mcp_servers.py
 """
-import json
+import mmap
+import orjson
+import os
+import selectors
 import subprocess
 import time
 import sys
 
-def test_server(server_file, test_name):
-    """Test a single MCP server"""
+def write_batch(process, requests):
+    """Send requests as one JSON-RPC batch without waiting for the reply"""
+    process.stdin.write(orjson.dumps(requests) + b'\n')
+    process.stdin.flush()
+
+def parse_batch(process, requests, line):
+    """Turn the batch reply line into responses keyed by id.
+    
+    Falls back to one request per line if the server does not answer the
+    batch with an array (e.g. -32600 Invalid Request).
+    """
+    reply = orjson.loads(line) if line else None
+    if isinstance(reply, list):
+        return {r.get('id'): r for r in reply}
+    
+    print("   (server rejected the batch, sending requests one by one)")
+    # Still one write and one flush: queue every line, then read the replies back
+    buffer = bytearray()
+    for request in requests:
+        buffer += orjson.dumps(request)
+        buffer += b'\n'
+    process.stdin.write(buffer)
+    process.stdin.flush()
+    
+    # Servers may answer pipelined requests out of order, so match replies by id
+    responses = {}
+    for _ in requests:
+        line = process.stdout.readline()
+        if line:
+            response = orjson.loads(line)
+            responses[response.get('id')] = response
+    return responses
+
+def send_batch(process, requests):
+    """Send requests as one JSON-RPC batch and return the responses keyed by id"""
+    write_batch(process, requests)
+    return parse_batch(process, requests, process.stdout.readline())
+
+def read_replies(processes, timeout=60):
+    """Read one reply line from every process, in whatever order they become ready"""
+    replies = {}
+    with selectors.DefaultSelector() as selector:
+        for key, process in processes.items():
+            selector.register(process.stdout, selectors.EVENT_READ, key)
+        while selector.get_map():
+            events = selector.select(timeout)
+            if not events:
+                break  # Leave slow servers unanswered instead of hanging the test
+            for event, _ in events:
+                replies[event.data] = event.fileobj.readline()
+                selector.unregister(event.fileobj)
+    return replies
+
+def spawn_server(server_file):
+    """Start an MCP server subprocess"""
+    return subprocess.Popen(
+        [sys.executable, server_file],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        bufsize=65536  # Binary pipes: orjson bytes in and out; big reads for large tool results
+    )
+
+def build_requests(server_file):
+    """Initialize, tools/list and one server-specific tool call"""
+    init_request = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "initialize",
+        "params": {"protocolVersion": "2024-11-05"}
+    }
+    tools_request = {
+        "jsonrpc": "2.0", 
+        "id": 2,
+        "method": "tools/list"
+    }
+    
+    if 'abuseIP' in server_file:
+        tool_request = {
+            "jsonrpc": "2.0",
+            "id": 3,
+            "method": "tools/call",
+            "params": {
+                "name": "check_ip_reputation",
+                "arguments": {"ip": "8.8.8.8"}  # Google DNS - should be clean
+            }
+        }
+    else:  # ThreatFox
+        # tool_request = {
+        #     "jsonrpc": "2.0", 
+        #     "id": 3,
+        #     "method": "tools/call",
+        #     "params": {
+        #         "name": "get_recent_iocs",
+        #         "arguments": {"days": 1, "limit": 3}
+        #     }
+        # }
+
+        tool_request = {
+            "jsonrpc": "2.0", 
+            "id": 3,
+            "method": "tools/call",
+            "params": {
+                "name": "search_ioc",
+                "arguments": {"ioc": "134.122.177.12"}
+            }
+        }
+    return [init_request, tools_request, tool_request]
+
+def test_server(server_file, test_name, process=None, reply_line=None):
+    """Test a single MCP server.
+    
+    process/reply_line let main() spawn several servers up front and hand in
+    the batch reply it already read; otherwise the server is started here.
+    """
     print(f"\n{'='*50}")
     print(f"Testing {test_name}")
     print(f"{'='*50}")
     
     try:
-        # Start server process
-        process = subprocess.Popen(
-            [sys.executable, server_file],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1
-        )
+        requests = build_requests(server_file)
+        if process is None:
+            process = spawn_server(server_file)
+            # All three calls go out as one JSON-RPC batch (one write, one read)
+            responses = send_batch(process, requests)
+        else:
+            responses = parse_batch(process, requests, reply_line)
         
         # Test 1: Initialize
         print("\n1. Testing initialization...")
-        init_request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "initialize",
-            "params": {"protocolVersion": "2024-11-05"}
-        }
-        
-        process.stdin.write(json.dumps(init_request) + '\n')
-        process.stdin.flush()
-        
-        response = process.stdout.readline()
+        response = responses.get(1)
         if response:
-            print(f"✓ Initialize: {json.loads(response).get('result', {}).get('serverInfo', {}).get('name', 'OK')}")
+            print(f"✓ Initialize: {response.get('result', {}).get('serverInfo', {}).get('name', 'OK')}")
         else:
             print("✗ No response to initialize")
         
         # Test 2: List tools
         print("2. Testing tools list...")
-        tools_request = {
-            "jsonrpc": "2.0", 
-            "id": 2,
-            "method": "tools/list"
-        }
-        
-        process.stdin.write(json.dumps(tools_request) + '\n')
-        process.stdin.flush()
-        
-        response = process.stdout.readline()
+        response = responses.get(2)
         if response:
-            tools_data = json.loads(response)
-            tools = tools_data.get('result', {}).get('tools', [])
+            tools = response.get('result', {}).get('tools', [])
             print(f"✓ Found {len(tools)} tools:")
             for tool in tools:
                 print(f"   - {tool.get('name', 'Unknown')}: {tool.get('description', 'No description')[:60]}...")
@@ -66,44 +160,8 @@ def test_server(server_file, test_name):
         
         # Test 3: Call a tool (server-specific)
         print("3. Testing tool call...")
-        if 'abuseIP' in server_file:
-            tool_request = {
-                "jsonrpc": "2.0",
-                "id": 3,
-                "method": "tools/call",
-                "params": {
-                    "name": "check_ip_reputation",
-                    "arguments": {"ip": "8.8.8.8"}  # Google DNS - should be clean
-                }
-            }
-        else:  # ThreatFox
-            # tool_request = {
-            #     "jsonrpc": "2.0", 
-            #     "id": 3,
-            #     "method": "tools/call",
-            #     "params": {
-            #         "name": "get_recent_iocs",
-            #         "arguments": {"days": 1, "limit": 3}
-            #     }
-            # }
-
-            tool_request = {
-                "jsonrpc": "2.0", 
-                "id": 3,
-                "method": "tools/call",
-                "params": {
-                    "name": "search_ioc",
-                    "arguments": {"ioc": "134.122.177.12"}
-                }
-            }
-
-        
-        process.stdin.write(json.dumps(tool_request) + '\n')
-        process.stdin.flush()
-        
-        response = process.stdout.readline()
-        if response:
-            result = json.loads(response)
+        result = responses.get(3)
+        if result:
             if 'result' in result:
                 print("✓ Tool call successful")
                 # Print first few lines of response
@@ -111,7 +169,7 @@ def test_server(server_file, test_name):
                 if content:
                     # Parse and show summary
                     try:
-                        data = json.loads(content)
+                        data = orjson.loads(content)
                         if 'abuseIP' in server_file:
                             print(f"   IP: {data.get('ip', 'N/A')}")
                             print(f"   Threat Level: {data.get('threat_level', 'N/A')}")
@@ -146,12 +204,19 @@ def main():
     
     # Check if .env file exists
     try:
-        with open('.env', 'r') as f:
-            env_content = f.read()
-            if 'your_abuseipdb_api_key_here' in env_content:
-                print("\n  WARNING: Please update your .env file with real API keys!")
-                print("   Edit .env and replace 'your_abuseipdb_api_key_here' with your actual API key")
-                print("   Get your key from: https://www.abuseipdb.com/api")
+        # Byte search straight over the mapped file; no read or decode needed
+        fd = os.open('.env', os.O_RDONLY)
+        try:
+            placeholder = False
+            if os.fstat(fd).st_size:  # mmap cannot map an empty file
+                with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                    placeholder = mm.find(b'your_abuseipdb_api_key_here') != -1
+        finally:
+            os.close(fd)
+        if placeholder:
+            print("\n  WARNING: Please update your .env file with real API keys!")
+            print("   Edit .env and replace 'your_abuseipdb_api_key_here' with your actual API key")
+            print("   Get your key from: https://www.abuseipdb.com/api")
     except FileNotFoundError:
         print("\n No .env file found. Creating template...")
         with open('.env', 'w') as f:
@@ -162,9 +227,25 @@ def main():
         print("   Please edit .env with your API keys before running tests")
         return
     
-    # Test both servers
-    test_server('abuseIP_mcp_server.py', 'AbuseIPDB Server')
-    test_server('threatFox_mcp_server.py', 'ThreatFox Server')
+    # Test both servers concurrently: spawn both, send both batches, then
+    # multiplex their stdouts so total time is the slower server, not the sum
+    servers = {
+        'abuseIP_mcp_server.py': 'AbuseIPDB Server',
+        'threatFox_mcp_server.py': 'ThreatFox Server',
+    }
+    processes = {}
+    for server_file in servers:
+        try:
+            processes[server_file] = spawn_server(server_file)
+            write_batch(processes[server_file], build_requests(server_file))
+        except Exception as e:
+            print(f"✗ Could not start {server_file}: {str(e)}")
+            processes.pop(server_file, None)
+    replies = read_replies(processes)
+    
+    # Reports are printed one server at a time so output does not interleave
+    for server_file, process in processes.items():
+        test_server(server_file, servers[server_file], process, replies.get(server_file, b''))
     
     print(f"\n{'='*50}")
     print("Test Summary")
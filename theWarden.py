@@ -5,32 +5,57 @@ An autonomous SOC analyst that uses Qwen3 to make decisions about threat analysi
 """
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
 from mcp_manager import MCPManager
-from llm_interface import LLMInterface
+from llm_interface import AnalysisContext, LLMInterface
 from tool_executor import ToolExecutor
+from semantic_cache import SemanticCache
 
 class TheWarden:
     """Main Warden Agent - Autonomous SOC Analyst"""
     
     def __init__(self, config_file: str = "mcp_server_config.json"):
         self.mcp_manager = MCPManager(config_file)
-        self.llm = LLMInterface()
+        # One pooled keep-alive session for all of the Warden's own HTTP traffic
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16,
+                              max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504]))
+        self.http.mount("http://", adapter)
+        self.http.mount("https://", adapter)
+        self.http.headers["Connection"] = "keep-alive"
+        self.llm = LLMInterface(session=self.http)
         self.tool_executor = ToolExecutor(self.mcp_manager)
         self.max_iterations = 5  # Prevent infinite loops
+        self.confidence_threshold = 0.85  # Stop iterating once the LLM is this sure of its assessment
+        self.max_parallel_tools = 8  # Cap on concurrent tool calls from one "use_tools" decision
+        self.semantic_cache = SemanticCache()
+        self.static_prefix = None  # System prompt + tool list, built once in start()
         
     def start(self):
         """Initialize the Warden system"""
         print("[WARDEN] The Warden is initializing...")
         
-        if not self.mcp_manager.start_all_servers():
+        # Load the model while the MCP servers start so the first query hits a hot model
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-warmup") as pool:
+            warmup = pool.submit(self.llm.warmup)
+            servers_started = self.mcp_manager.start_all_servers()
+            warmup.result()
+        
+        if not servers_started:
             print("[WARDEN] Failed to start threat intelligence servers")
             return False
             
         available_tools = self.mcp_manager.get_all_tools()
         self.tool_executor.set_available_tools(available_tools)
+        # Identical across iterations and sessions, so Ollama can keep its KV cache warm
+        self.static_prefix = self.llm.build_system_prompt(self.tool_executor.get_tool_descriptions())
+        # Reports cached under a different tool set must not be reused
+        self.semantic_cache.set_namespace(*sorted(f"{tool.get('server')}:{tool['name']}" for tool in available_tools))
         
         print(f"[WARDEN] Online with {len(available_tools)} threat intelligence tools")
         for tool in available_tools:
@@ -42,29 +67,47 @@ class TheWarden:
         """Shutdown the Warden system"""
         print("[WARDEN] The Warden is shutting down...")
         self.mcp_manager.stop_all_servers()
+        self.tool_executor.save_result_cache()
+        self.tool_executor.close()
+        self.semantic_cache.close()
+        self.http.close()
     
-    def analyze(self, user_query: str) -> str:
+    def analyze(self, user_query: str, ignore_cache: bool = False) -> str:
         """
         Main analysis function - Warden thinks and acts autonomously
+        
+        Near-duplicate queries about the same indicators reuse a recent report,
+        and repeated tool calls reuse cached results, unless ignore_cache is set
+        (analyst "fresh data" mode).
         """
         print(f"[WARDEN] Analyzing: {user_query}")
         
+        # Trivial query (just one indicator we reported on recently): no LLM at all
+        if not ignore_cache:
+            cached_report = self.semantic_cache.lookup_ioc(user_query)
+            if cached_report:
+                return cached_report
+        
+        query_embedding = self.llm.embed(user_query)
+        if query_embedding and not ignore_cache:
+            cached_report = self.semantic_cache.lookup(user_query, query_embedding)
+            if cached_report:
+                return cached_report
+        
         # Initialize the analysis session
-        analysis_context = {
-            "user_query": user_query,
-            "iteration": 0,
-            "tool_results": [],
-            "analysis_complete": False
-        }
+        analysis_context = AnalysisContext(user_query)
+        
+        final_report = None
         
         # Let Qwen3 think and act iteratively
         for iteration in range(self.max_iterations):
-            analysis_context["iteration"] = iteration + 1
+            analysis_context.iteration = iteration + 1
             
             print(f"[WARDEN] Thinking... (iteration {iteration + 1})")
             
             # Ask Qwen3 what to do next
-            decision = self.llm.get_next_action(analysis_context, self.tool_executor.get_tool_descriptions())
+            decision = self.llm.get_next_action(analysis_context, self.tool_executor.get_tool_descriptions(),
+                                              system=self.static_prefix)
             
             if not decision:
                 print("[WARDEN] LLM communication error")
@@ -72,9 +115,16 @@ class TheWarden:
                 
             # Parse the decision
             action = decision.get("action", "complete")
+            try:
+                confidence = float(decision.get("confidence") or 0.0)
+            except (TypeError, ValueError):
+                confidence = 0.0
             
             if action == "complete":
                 print("[WARDEN] Analysis complete")
+                # A confident decision can carry the report itself, saving the final LLM call
+                if confidence >= self.confidence_threshold and decision.get("final_report"):
+                    final_report = decision["final_report"]
                 break
             elif action == "use_tool":
                 tool_name = decision.get("tool_name")
@@ -83,10 +133,10 @@ class TheWarden:
                 print(f"[WARDEN] Using tool: {tool_name}")
                 
                 # Execute the tool
-                tool_result = self.tool_executor.execute_tool(tool_name, tool_args)
+                tool_result = self.tool_executor.execute_tool(tool_name, tool_args, force_refresh=ignore_cache)
                 
                 if tool_result:
-                    analysis_context["tool_results"].append({
+                    analysis_context.tool_results.append({
                         "tool": tool_name,
                         "arguments": tool_args,
                         "result": tool_result,
@@ -94,12 +144,42 @@ class TheWarden:
                     })
                 else:
                     print(f"[WARDEN] Tool execution failed: {tool_name}")
+            elif action == "use_tools":
+                calls = [call for call in decision.get("calls") or [] if isinstance(call, dict) and call.get("tool_name")]
+                print(f"[WARDEN] Using {len(calls)} tools in parallel: {', '.join(call['tool_name'] for call in calls)}")
+                
+                # Independent calls overlap; calls to different servers run concurrently
+                results = self.tool_executor.execute_tools_batch(
+                    [(call["tool_name"], call.get("arguments", {})) for call in calls],
+                    max_concurrent=self.max_parallel_tools, force_refresh=ignore_cache
+                )
+                
+                for call, tool_result in zip(calls, results):
+                    if tool_result:
+                        analysis_context.tool_results.append({
+                            "tool": call["tool_name"],
+                            "arguments": call.get("arguments", {}),
+                            "result": tool_result,
+                            "iteration": iteration + 1
+                        })
+                    else:
+                        print(f"[WARDEN] Tool execution failed: {call['tool_name']}")
             else:
                 print(f"[WARDEN] Unknown action: {action}")
+            
+            # Enough evidence already: run what was asked for, then stop iterating
+            if confidence >= self.confidence_threshold:
+                print(f"[WARDEN] Confidence {confidence:.2f} reached, concluding early")
+                break
+        
+        if final_report is None:
+            # Generate final analysis report
+            print("[WARDEN] Generating final analysis...")
+            final_report = self.llm.generate_final_analysis(analysis_context, system=self.static_prefix)
         
-        # Generate final analysis report
-        print("[WARDEN] Generating final analysis...")
-        final_report = self.llm.generate_final_analysis(analysis_context)
+        # Only cache investigations that ran tools and produced a real report
+        if query_embedding and analysis_context.tool_results and final_report != "Failed to generate analysis report.":
+            self.semantic_cache.store(user_query, query_embedding, final_report)
         
         return final_report
     
@@ -5,24 +5,203 @@ Provides threat intelligence data via the ThreatFox API from abuse.ch
 """
 
 import asyncio
-import json
+import inspect
+import base64
+import orjson
+import zlib
 import sys
 import os
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import ipaddress
+import itertools
+import re
+import select
+from functools import lru_cache
+from collections import Counter, OrderedDict
 from typing import Any, Dict, List, Optional
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
+try:
+    # Optional: several in-flight ThreatFox queries share one multiplexed HTTP/2 connection
+    import httpx
+except ImportError:
+    httpx = None
+
 # Load environment variables
 load_dotenv()
 
+# Results larger than this are gzip-compressed for clients that negotiated it
+GZIP_THRESHOLD = 4096
+
+# Raw get_iocs responses are reused for this long, for up to this many distinct `days` values
+IOC_CACHE_TTL = 300
+IOC_CACHE_SIZE = 8
+
+# search_ioc "no_result" answers are remembered this long, for up to this many IOCs
+SEARCH_MISS_TTL = 300
+SEARCH_MISS_SIZE = 4096
+
+# ThreatFox ioc_type values that carry an IP address
+_IP_TYPES = frozenset({"ip", "ip:port"})
+
+# get_recent_iocs ioc_type filter values -> the ThreatFox ioc_type values they accept
+_ACCEPT_TYPES = {
+    "ip": _IP_TYPES,
+    "domain": frozenset({"domain"}),
+    "url": frozenset({"url"}),
+    "md5_hash": frozenset({"md5_hash"}),
+    "sha1_hash": frozenset({"sha1_hash"}),
+    "sha256_hash": frozenset({"sha256_hash"})
+}
+_TYPE_BUCKET = {ioc_type: name for name, accepted in _ACCEPT_TYPES.items() for ioc_type in accepted}
+
+# Responses bypass sys.stdout and go to the fd in as few write() calls as possible
+_STDOUT_FD = sys.stdout.fileno()
+
+# Longest request line accepted from stdin (asyncio's StreamReader defaults to 64 KiB)
+MAX_REQUEST_LINE = 16 * 1024 * 1024
+
+# Dotted-quad IPv4 exactly as ipaddress accepts it: ASCII digits, 0-255, no leading zeros
+_IPV4_RE = re.compile(r"(?:(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])\.){3}(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])")
+
+@lru_cache(maxsize=4096)
+def _is_ip_slow(value: str) -> bool:
+    """Full ipaddress parse for anything that is not a plain dotted quad"""
+    try:
+        ipaddress.ip_address(value)
+        return True
+    except ValueError:
+        return False
+
+def is_valid_ip(value: str) -> bool:
+    """Regex fast path for IPv4; ipaddress only for strings that could be IPv6"""
+    if _IPV4_RE.fullmatch(value):
+        return True
+    return ":" in value and _is_ip_slow(value)
+
+def create_http_session() -> requests.Session:
+    """Pooled keep-alive session that retries transient upstream failures"""
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+def create_http2_client(base_url: str, headers: Dict[str, str]) -> Optional["httpx.AsyncClient"]:
+    """HTTP/2 client with one TLS setup per host; None without httpx[http2], so the requests session is used"""
+    if httpx is None:
+        return None
+    limits = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+    try:
+        # Connection-level retries only; the requests session also retries 429/5xx
+        transport = httpx.AsyncHTTPTransport(http2=True, retries=3, limits=limits)
+    except ImportError:
+        return None  # httpx installed without the h2 extra
+    return httpx.AsyncClient(base_url=base_url, headers=headers, timeout=15, transport=transport)
+
+# Exceptions that mean the ThreatFox request itself failed, whichever client sent it
+HTTP_ERRORS = (requests.exceptions.RequestException,) + ((httpx.HTTPError,) if httpx else ())
+
+def _intern(value: Any) -> Any:
+    """Share one str object per distinct low-cardinality value (types, families, reporters, tags)"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+def project_ioc(ioc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Trim a raw ThreatFox row to the fields the tools report; None for an IP IOC with a bad address"""
+    tags = ioc.get("tags", [])
+    processed_ioc = {
+        "ioc": ioc.get("ioc", ""),
+        "ioc_type": _intern(ioc.get("ioc_type", "")),
+        "threat_type": _intern(ioc.get("threat_type", "Unknown")),
+        "malware": _intern(ioc.get("malware", "Unknown")),
+        "confidence_level": ioc.get("confidence_level", 0),
+        "first_seen": ioc.get("first_seen", ""),
+        "last_seen": ioc.get("last_seen", ""),
+        "tags": [_intern(tag) for tag in tags] if tags else tags,
+        "reporter": _intern(ioc.get("reporter", "Unknown")),
+        "source": "ThreatFox"
+    }
+    
+    # Additional processing for IP addresses
+    if processed_ioc["ioc_type"] in _IP_TYPES:
+        ip_addr = processed_ioc["ioc"].partition(":")[0]
+        if not is_valid_ip(ip_addr):
+            return None
+        processed_ioc["validated_ip"] = ip_addr
+    return processed_ioc
+
+def project_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Project a decoded get_iocs row list in place, dropping bad IP rows.
+    
+    Each raw dict is released as soon as its record replaces it, so peak memory
+    stays near one copy of the response instead of raw list + projected list.
+    """
+    kept = 0
+    for raw in rows:
+        record = project_ioc(raw)
+        if record is not None:
+            rows[kept] = record
+            kept += 1
+    del rows[kept:]
+    return rows
+
+def index_by_type(records: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Records split per ioc_type filter value, order preserved, so a typed query only visits its own rows"""
+    buckets = {name: [] for name in _ACCEPT_TYPES}
+    for record in records:
+        name = _TYPE_BUCKET.get(record["ioc_type"])
+        if name is not None:
+            buckets[name].append(record)
+    return buckets
+
 class ThreatFoxServer:
     def __init__(self):
         self.name = "threatfox-server"
         self.version = "1.0.0"
+        self.session = create_http_session()  # Reused across tool calls
         self.api_key = os.getenv("THREATFOX_API_KEY")  # Optional
         self.base_url = "https://threatfox-api.abuse.ch/api/v1/"
+        self.headers = {
+            "Accept": "application/json",
+            "Content-Type": "application/json"
+        }
+        if self.api_key:
+            self.headers["Auth-Key"] = self.api_key
+        self.client = create_http2_client(self.base_url, self.headers)
+        self.gzip_enabled = False  # Set during initialize from clientInfo
+        # days -> (fetched_at, decoded get_iocs response), oldest first
+        self._ioc_cache: "OrderedDict[int, tuple]" = OrderedDict()
+        # IOC -> time ThreatFox last answered "no_result" for it, oldest first
+        self._search_misses: "OrderedDict[str, float]" = OrderedDict()
+        # One lock per days value so concurrent callers share a single in-flight fetch
+        self._ioc_locks: Dict[int, asyncio.Lock] = {}
+        
+        # Dispatch tables: one dict lookup per request instead of an if/elif chain
+        self._methods = {
+            "initialize": self.handle_initialize,
+            "tools/list": self.handle_list_tools,
+            "tools/call": self.handle_call_tool
+        }
+        self._tools = {
+            "get_recent_iocs": self.get_recent_iocs,
+            "search_ioc": self.search_ioc,
+            "get_malware_info": self.get_malware_info,
+            "get_ip_iocs": self.get_ip_iocs
+        }
+        # Accepted keyword arguments per tool; anything else a client sends is ignored
+        self._tool_params = {name: frozenset(inspect.signature(tool).parameters) for name, tool in self._tools.items()}
+        
+        # Static responses built once. orjson >= 3.9 can also splice the tools/list
+        # result in as pre-serialized JSON, so it is encoded only once per process.
+        tools_result = {"tools": self.tool_definitions()}
+        self._tools_list_result = orjson.Fragment(orjson.dumps(tools_result)) if hasattr(orjson, "Fragment") else tools_result
+        self._initialize_results = {enabled: self._initialize_result(enabled) for enabled in (False, True)}
 
     async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Handle incoming MCP requests"""
@@ -31,37 +210,41 @@ class ThreatFoxServer:
         request_id = request.get("id")
 
         try:
-            if method == "initialize":
-                return await self.handle_initialize(request_id, params)
-            elif method == "tools/list":
-                return await self.handle_list_tools(request_id)
-            elif method == "tools/call":
-                return await self.handle_call_tool(request_id, params)
-            else:
+            handler = self._methods.get(method)
+            if handler is None:
                 return self.error_response(request_id, -32601, f"Method not found: {method}")
+            return await handler(request_id, params)
         
         except Exception as e:
             return self.error_response(request_id, -32603, f"Internal error: {str(e)}")
 
+    def _initialize_result(self, gzip_enabled: bool) -> Dict[str, Any]:
+        """initialize result advertising the negotiated capabilities"""
+        capabilities = {"tools": {}}
+        if gzip_enabled:
+            capabilities["experimental"] = {"gzip": {"threshold": GZIP_THRESHOLD}}
+        return {
+            "protocolVersion": "2024-11-05",
+            "capabilities": capabilities,
+            "serverInfo": {
+                "name": self.name,
+                "version": self.version
+            }
+        }
+
     async def handle_initialize(self, request_id: int, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle initialization request"""
+        client_info = params.get("clientInfo") or {}
+        self.gzip_enabled = "gzip" in str(client_info.get("accept-encoding", ""))
         return {
             "jsonrpc": "2.0",
             "id": request_id,
-            "result": {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {
-                    "tools": {}
-                },
-                "serverInfo": {
-                    "name": self.name,
-                    "version": self.version
-                }
-            }
+            "result": self._initialize_results[self.gzip_enabled]
         }
 
-    async def handle_list_tools(self, request_id: int) -> Dict[str, Any]:
-        """List available tools"""
+    @staticmethod
+    def tool_definitions() -> List[Dict[str, Any]]:
+        """Static tool schemas advertised by tools/list"""
         tools = [
             {
                 "name": "get_recent_iocs",
@@ -155,11 +338,14 @@ class ThreatFoxServer:
                 }
             }
         ]
+        return tools
 
+    async def handle_list_tools(self, request_id: int, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """List available tools (result prebuilt in __init__)"""
         return {
             "jsonrpc": "2.0",
             "id": request_id,
-            "result": {"tools": tools}
+            "result": self._tools_list_result
         }
 
     async def handle_call_tool(self, request_id: int, params: Dict[str, Any]) -> Dict[str, Any]:
@@ -167,27 +353,12 @@ class ThreatFoxServer:
         tool_name = params.get("name")
         arguments = params.get("arguments", {})
 
-        if tool_name == "get_recent_iocs":
-            result = await self.get_recent_iocs(
-                arguments.get("days", 1),
-                arguments.get("ioc_type", "all"),
-                arguments.get("malware_family"),
-                arguments.get("limit", 100)
-            )
-        elif tool_name == "search_ioc":
-            result = await self.search_ioc(arguments.get("ioc"))
-        elif tool_name == "get_malware_info":
-            result = await self.get_malware_info(
-                arguments.get("malware"),
-                arguments.get("days", 7)
-            )
-        elif tool_name == "get_ip_iocs":
-            result = await self.get_ip_iocs(
-                arguments.get("days", 1),
-                arguments.get("confidence_threshold", 50)
-            )
-        else:
+        tool = self._tools.get(tool_name)
+        if tool is None:
             return self.error_response(request_id, -32602, f"Unknown tool: {tool_name}")
+        # Argument names match the tool methods' parameters; omitted ones use the method defaults
+        accepted = self._tool_params[tool_name]
+        result = await tool(**{key: value for key, value in arguments.items() if key in accepted})
 
         return {
             "jsonrpc": "2.0",
@@ -196,107 +367,145 @@ class ThreatFoxServer:
                 "content": [
                     {
                         "type": "text",
-                        "text": json.dumps(result, indent=2)
+                        "text": orjson.dumps(result, option=orjson.OPT_INDENT_2).decode()
                     }
                 ]
             }
         }
 
-    async def get_recent_iocs(self, days: int = 1, ioc_type: str = "all", 
-                            malware_family: Optional[str] = None, limit: int = 100) -> Dict[str, Any]:
-        """Get recent IOCs from ThreatFox"""
-        headers = {
-            "Accept": "application/json",
-            "Content-Type": "application/json"
-        }
+    async def _query(self, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """POST a ThreatFox query and decode the body.
         
-        if self.api_key:
-            headers["Auth-Key"] = self.api_key
-
-        payload = {
-            "query": "get_iocs",
-            "days": days
-        }
-
+        With httpx[http2] installed, concurrent queries are streams on one
+        multiplexed connection; otherwise the pooled requests session runs on a
+        worker thread. Either way the call stays off the event loop, and both
+        bodies are orjson bytes with no stdlib json pass or intermediate str.
+        """
+        if self.client is not None:
+            response = await self.client.post("", content=orjson.dumps(payload), timeout=timeout)
+            return orjson.loads(response.content)
+        response = await asyncio.to_thread(self.session.post, self.base_url, headers=self.headers,
+                                           data=orjson.dumps(payload), timeout=timeout)
+        return orjson.loads(response.content)
+
+    async def _fetch_iocs(self, days: int) -> Dict[str, Any]:
+        """get_iocs response for `days` with its rows already projected, cached while fresh"""
+        lock = self._ioc_locks.setdefault(days, asyncio.Lock())
+        async with lock:
+            cached = self._ioc_cache.get(days)
+            if cached and time.monotonic() - cached[0] < IOC_CACHE_TTL:
+                self._ioc_cache.move_to_end(days)
+                return cached[1]
+
+            # Windows are cumulative, so a fresh wider window already holds this one
+            derived = self._narrow_cached_window(days)
+            if derived is not None:
+                return derived
+
+            data = await self._query({"query": "get_iocs", "days": days}, timeout=15)
+            # Only successful answers are worth reusing
+            if data.get("query_status") == "ok":
+                # Project every row once per fetch; cached calls reuse the records as-is
+                data["data"] = project_rows(data.get("data") or [])
+                data["_by_type"] = index_by_type(data["data"])
+                # Newly reported IOCs must not keep answering "not found" from the miss cache
+                for record in data["data"]:
+                    self._search_misses.pop(record["ioc"], None)
+                self._ioc_cache[days] = (time.monotonic(), data)
+                self._ioc_cache.move_to_end(days)
+                while len(self._ioc_cache) > IOC_CACHE_SIZE:
+                    self._ioc_cache.popitem(last=False)
+            return data
+
+    def _narrow_cached_window(self, days: int) -> Optional[Dict[str, Any]]:
+        """Cut a fresh cached response for a wider window down to the last `days` days"""
+        now = time.monotonic()
+        wider = [key for key, (fetched_at, _) in self._ioc_cache.items()
+                 if key > days and now - fetched_at < IOC_CACHE_TTL]
+        if not wider:
+            return None
+        fetched_at, data = self._ioc_cache[min(wider)]
+        # first_seen is "YYYY-MM-DD HH:MM:SS UTC", so string order is time order
+        cutoff = (datetime.utcnow() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+        records = [ioc for ioc in data["data"] if ioc["first_seen"] >= cutoff]
+        narrowed = {**data, "data": records, "_by_type": index_by_type(records)}
+        # Expires together with the response it was cut from
+        self._ioc_cache[days] = (fetched_at, narrowed)
+        while len(self._ioc_cache) > IOC_CACHE_SIZE:
+            self._ioc_cache.popitem(last=False)
+        return narrowed
+
+    async def _processed_iocs(self, days: int, ioc_type: str = "all", malware_family: Optional[str] = None,
+                              limit: int = 100, min_confidence: Optional[int] = None):
+        """Filtered IOC records for the last `days` as (iocs, None), or (None, error dict).
+        
+        Records are shared with the response cache, so callers must not modify them.
+        """
         try:
-            response = requests.post(self.base_url, headers=headers, json=payload, timeout=15)
-            data = response.json()
+            data = await self._fetch_iocs(days)
 
             if data.get("query_status") != "ok":
-                return {"error": "ThreatFox API error", "details": data}
+                return None, {"error": "ThreatFox API error", "details": data}
 
-            iocs = data.get("data", [])
-            
-            # Filter by IOC type
-            if ioc_type != "all":
-                if ioc_type == "ip":
-                    iocs = [ioc for ioc in iocs if ioc.get("ioc_type") in ["ip:port", "ip"]]
-                else:
-                    iocs = [ioc for ioc in iocs if ioc.get("ioc_type") == ioc_type]
-            
-            # Filter by malware family
-            if malware_family:
-                iocs = [ioc for ioc in iocs if malware_family.lower() in ioc.get("malware", "").lower()]
-            
-            # Limit results
-            iocs = iocs[:limit]
-            
-            # Process and format results
-            processed_iocs = []
-            for ioc in iocs:
-                processed_ioc = {
-                    "ioc": ioc.get("ioc", ""),
-                    "ioc_type": ioc.get("ioc_type", ""),
-                    "threat_type": ioc.get("threat_type", "Unknown"),
-                    "malware": ioc.get("malware", "Unknown"),
-                    "confidence_level": ioc.get("confidence_level", 0),
-                    "first_seen": ioc.get("first_seen", ""),
-                    "last_seen": ioc.get("last_seen", ""),
-                    "tags": ioc.get("tags", []),
-                    "reporter": ioc.get("reporter", "Unknown"),
-                    "source": "ThreatFox"
-                }
-                
-                # Additional processing for IP addresses
-                if ioc.get("ioc_type") in ["ip:port", "ip"]:
-                    ip_addr = ioc.get("ioc", "").split(":")[0]
-                    try:
-                        ipaddress.ip_address(ip_addr)
-                        processed_ioc["validated_ip"] = ip_addr
-                    except ValueError:
-                        continue
-                
-                processed_iocs.append(processed_ioc)
+            # The type filter picks a prebuilt bucket, so rows of other types are never visited
+            if ioc_type == "all":
+                rows = data["data"]
+            elif ioc_type in data["_by_type"]:
+                rows = data["_by_type"][ioc_type]
+            else:
+                rows = [ioc for ioc in data["data"] if ioc["ioc_type"] == ioc_type]
+            family = malware_family.lower() if malware_family else None
 
-            return {
-                "total_results": len(processed_iocs),
-                "query_parameters": {
-                    "days": days,
-                    "ioc_type": ioc_type,
-                    "malware_family": malware_family,
-                    "limit": limit
-                },
-                "iocs": processed_iocs,
-                "source": "ThreatFox"
-            }
+            # Malware and confidence filters plus the limit in one lazy pass
+            def matching():
+                for ioc in rows:
+                    if family and family not in (ioc["malware"] or "").lower():
+                        continue
+                    if min_confidence is not None and ioc["confidence_level"] < min_confidence:
+                        continue
+                    yield ioc
+            
+            return list(itertools.islice(matching(), limit)), None
 
-        except requests.exceptions.RequestException as e:
-            return {"error": f"ThreatFox request failed: {str(e)}"}
+        except HTTP_ERRORS as e:
+            return None, {"error": f"ThreatFox request failed: {str(e)}"}
         except Exception as e:
-            return {"error": f"Unexpected error: {str(e)}"}
+            return None, {"error": f"Unexpected error: {str(e)}"}
+
+    async def get_recent_iocs(self, days: int = 1, ioc_type: str = "all", 
+                            malware_family: Optional[str] = None, limit: int = 100) -> Dict[str, Any]:
+        """Get recent IOCs from ThreatFox"""
+        processed_iocs, error = await self._processed_iocs(days, ioc_type, malware_family, limit)
+        if error:
+            return error
+
+        return {
+            "total_results": len(processed_iocs),
+            "query_parameters": {
+                "days": days,
+                "ioc_type": ioc_type,
+                "malware_family": malware_family,
+                "limit": limit
+            },
+            "iocs": processed_iocs,
+            "source": "ThreatFox"
+        }
 
-    async def search_ioc(self, ioc: str) -> Dict[str, Any]:
+    async def search_ioc(self, ioc: Optional[str] = None) -> Dict[str, Any]:
         """Search for a specific IOC"""
         if not ioc:
             return {"error": "IOC parameter is required"}
 
-        headers = {
-            "Accept": "application/json",
-            "Content-Type": "application/json"
-        }
-        
-        if self.api_key:
-            headers["Auth-Key"] = self.api_key
+        # Recently confirmed negative: skip the round trip
+        missed_at = self._search_misses.get(ioc)
+        if missed_at is not None and time.monotonic() - missed_at < SEARCH_MISS_TTL:
+            return {
+                "ioc": ioc,
+                "found": False,
+                "message": "IOC not found in ThreatFox database",
+                "source": "ThreatFox",
+                "cache": "negative"
+            }
 
         payload = {
             "query": "search_ioc",
@@ -304,10 +513,13 @@ class ThreatFoxServer:
         }
 
         try:
-            response = requests.post(self.base_url, headers=headers, json=payload, timeout=10)
-            data = response.json()
+            data = await self._query(payload, timeout=10)
 
             if data.get("query_status") == "no_result":
+                self._search_misses[ioc] = time.monotonic()
+                self._search_misses.move_to_end(ioc)
+                while len(self._search_misses) > SEARCH_MISS_SIZE:
+                    self._search_misses.popitem(last=False)
                 return {
                     "ioc": ioc,
                     "found": False,
@@ -331,18 +543,15 @@ class ThreatFoxServer:
         except Exception as e:
             return {"error": f"Search request failed: {str(e)}"}
 
-    async def get_malware_info(self, malware: str, days: int = 7) -> Dict[str, Any]:
+    async def get_malware_info(self, malware: Optional[str] = None, days: int = 7) -> Dict[str, Any]:
         """Get information about specific malware family"""
         if not malware:
             return {"error": "Malware family name is required"}
 
         # First get recent IOCs
-        recent_data = await self.get_recent_iocs(days, "all", malware, 500)
-        
-        if "error" in recent_data:
-            return recent_data
-
-        iocs = recent_data.get("iocs", [])
+        iocs, error = await self._processed_iocs(days, "all", malware, 500)
+        if error:
+            return error
         
         if not iocs:
             return {
@@ -352,75 +561,84 @@ class ThreatFoxServer:
                 "source": "ThreatFox"
             }
 
-        # Analyze the data
-        threat_types = {}
-        ioc_types = {}
-        tags = {}
+        # Analyze the data: one pass, C-level counting
+        threat_types = Counter()
+        ioc_types = Counter()
+        tags = Counter()
         
         for ioc in iocs:
-            # Count threat types
-            threat_type = ioc.get("threat_type", "Unknown")
-            threat_types[threat_type] = threat_types.get(threat_type, 0) + 1
-            
-            # Count IOC types
-            ioc_type = ioc.get("ioc_type", "Unknown")
-            ioc_types[ioc_type] = ioc_types.get(ioc_type, 0) + 1
-            
-            # Count tags
-            for tag in ioc.get("tags", []):
-                tags[tag] = tags.get(tag, 0) + 1
+            threat_types[ioc.get("threat_type", "Unknown")] += 1
+            ioc_types[ioc.get("ioc_type", "Unknown")] += 1
+            tags.update(ioc.get("tags") or ())
 
         return {
             "malware_family": malware,
             "found": True,
             "analysis_period_days": days,
             "total_iocs": len(iocs),
-            "threat_type_distribution": threat_types,
-            "ioc_type_distribution": ioc_types,
-            "common_tags": dict(sorted(tags.items(), key=lambda x: x[1], reverse=True)[:10]),
+            "threat_type_distribution": dict(threat_types),
+            "ioc_type_distribution": dict(ioc_types),
+            "common_tags": dict(tags.most_common(10)),
             "recent_iocs": iocs[:20],  # Show first 20 IOCs
             "source": "ThreatFox"
         }
 
     async def get_ip_iocs(self, days: int = 1, confidence_threshold: int = 50) -> Dict[str, Any]:
         """Get IP-based IOCs for network security"""
-        recent_data = await self.get_recent_iocs(days, "all", None, 1000)
+        # IP type and confidence are filtered while processing, so dropped IOCs
+        # never get a record; every record kept has a validated address
+        ip_iocs, error = await self._processed_iocs(days, "ip", None, 1000, confidence_threshold)
+        if error:
+            return error
         
-        if "error" in recent_data:
-            return recent_data
-
-        all_iocs = recent_data.get("iocs", [])
-        
-        # Filter for IP-based IOCs
-        ip_iocs = []
-        for ioc in all_iocs:
-            if ioc.get("ioc_type") in ["ip:port", "ip"] and ioc.get("confidence_level", 0) >= confidence_threshold:
-                ip_addr = ioc.get("ioc", "").split(":")[0]
-                try:
-                    ipaddress.ip_address(ip_addr)
-                    ioc["clean_ip"] = ip_addr
-                    ip_iocs.append(ioc)
-                except ValueError:
-                    continue
+        # Summarize in one pass; records are cache-shared, so clean_ip goes on a copy
+        unique_ips = set()
+        high = medium = low = 0
+        for index, ioc in enumerate(ip_iocs):
+            confidence = ioc["confidence_level"]
+            ip_addr = ioc["validated_ip"]
+            ip_iocs[index] = {**ioc, "clean_ip": ip_addr}
+            unique_ips.add(ip_addr)
+            high += confidence >= 75
+            medium += 50 <= confidence < 75
+            low += confidence < 50
 
         # Create summary for network administrators
-        unique_ips = list(set([ioc["clean_ip"] for ioc in ip_iocs]))
-        
         return {
             "analysis_period_days": days,
             "confidence_threshold": confidence_threshold,
             "total_ip_iocs": len(ip_iocs),
             "unique_ip_addresses": len(unique_ips),
-            "ip_blocklist": unique_ips,
+            "ip_blocklist": list(unique_ips),
             "detailed_iocs": ip_iocs,
             "summary": {
-                "high_confidence": len([ioc for ioc in ip_iocs if ioc.get("confidence_level", 0) >= 75]),
-                "medium_confidence": len([ioc for ioc in ip_iocs if 50 <= ioc.get("confidence_level", 0) < 75]),
-                "low_confidence": len([ioc for ioc in ip_iocs if ioc.get("confidence_level", 0) < 50])
+                "high_confidence": high,
+                "medium_confidence": medium,
+                "low_confidence": low
             },
             "source": "ThreatFox"
         }
 
+    def compress_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace a large result with {"_gzip": base64(gzip(result JSON))} if the client accepts it"""
+        if not self.gzip_enabled or not isinstance(response, dict) or "result" not in response:
+            return response
+        payload = orjson.dumps(response["result"])
+        if len(payload) <= GZIP_THRESHOLD:
+            return response
+        # Level 1: most of the ratio of the default level at a fraction of the CPU
+        compressor = zlib.compressobj(1, zlib.DEFLATED, 31)
+        packed = compressor.compress(payload) + compressor.flush()
+        return {
+            "jsonrpc": "2.0",
+            "id": response.get("id"),
+            "result": {"_gzip": base64.b64encode(packed).decode("ascii")}
+        }
+
+    async def _invalid_request(self) -> Dict[str, Any]:
+        """Error entry for a non-object member of a batch"""
+        return self.error_response(None, -32600, "Invalid Request")
+
     def error_response(self, request_id: int, code: int, message: str) -> Dict[str, Any]:
         """Generate error response"""
         return {
@@ -432,41 +650,100 @@ class ThreatFoxServer:
             }
         }
 
+    def write_response(self, response: Any):
+        """Write one JSON-RPC frame straight to the stdout fd (no text layer, no buffer to flush)"""
+        frame = memoryview(orjson.dumps(response) + b"\n")
+        while frame:
+            try:
+                frame = frame[os.write(_STDOUT_FD, frame):]
+            except BlockingIOError:
+                # stdout shares a non-blocking file description with stdin (e.g. a tty)
+                select.select([], [_STDOUT_FD], [])
+
+    async def _serve(self, line: bytes):
+        """Parse one request line, dispatch it and write its response frame"""
+        request = None
+        try:
+            request = orjson.loads(line)
+            if isinstance(request, list):
+                # JSON-RPC batch: the calls run concurrently and are answered in one array
+                response = list(await asyncio.gather(*(
+                    self.handle_request(item) if isinstance(item, dict)
+                    else self._invalid_request()
+                    for item in request
+                ))) or self.error_response(None, -32600, "Invalid Request: empty batch")
+            elif isinstance(request, dict):
+                response = await self.handle_request(request)
+            else:
+                response = self.error_response(None, -32600, "Invalid Request")
+            if isinstance(response, list):
+                response = [self.compress_response(item) for item in response]
+            else:
+                response = self.compress_response(response)
+            
+            # Write response to stdout; a single synchronous write, so frames from
+            # concurrent requests never interleave
+            self.write_response(response)
+            
+        except orjson.JSONDecodeError as e:
+            error_response = {
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {
+                    "code": -32700,
+                    "message": f"Parse error: {str(e)}"
+                }
+            }
+            self.write_response(error_response)
+        except Exception as e:
+            # Every line gets an answer; an unhandled error would leave the client waiting for its timeout
+            request_id = request.get("id") if isinstance(request, dict) else None
+            self.write_response(self.error_response(request_id, -32603, f"Internal error: {str(e)}"))
+
+    async def _stdin_reader(self):
+        """Awaitable readline over stdin: an event-loop pipe reader, or a thread for regular files"""
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=MAX_REQUEST_LINE)
+        try:
+            await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin.buffer)
+            return reader.readline
+        except ValueError:
+            # connect_read_pipe only accepts pipes, sockets and character devices
+            return lambda: loop.run_in_executor(None, sys.stdin.buffer.readline)
+
     async def run(self):
         """Main server loop"""
         print(f"ThreatFox MCP Server v{self.version} starting...", file=sys.stderr)
         print("Server capabilities: IOC retrieval, threat intelligence, malware analysis", file=sys.stderr)
         
+        # Requests are served concurrently: a slow ThreatFox call does not hold up
+        # reading and answering the next line. Responses carry their id to match.
+        pending = set()
         try:
+            readline = await self._stdin_reader()
             while True:
                 # Read JSON-RPC request from stdin
-                line = await asyncio.get_event_loop().run_in_executor(None, sys.stdin.readline)
+                line = await readline()
                 
                 if not line:
                     break
                 
-                try:
-                    request = json.loads(line.strip())
-                    response = await self.handle_request(request)
-                    
-                    # Write response to stdout
-                    print(json.dumps(response), flush=True)
-                    
-                except json.JSONDecodeError as e:
-                    error_response = {
-                        "jsonrpc": "2.0",
-                        "id": None,
-                        "error": {
-                            "code": -32700,
-                            "message": f"Parse error: {str(e)}"
-                        }
-                    }
-                    print(json.dumps(error_response), flush=True)
+                task = asyncio.create_task(self._serve(line))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            
+            # Answer everything already read before exiting on EOF
+            if pending:
+                await asyncio.gather(*pending)
                     
         except KeyboardInterrupt:
             print("Server shutting down...", file=sys.stderr)
         except Exception as e:
             print(f"Server error: {str(e)}", file=sys.stderr)
+        finally:
+            if self.client is not None:
+                await self.client.aclose()
+            self.session.close()
 
 if __name__ == "__main__":
     server = ThreatFoxServer()
@@ -2,37 +2,163 @@
 tool_executor.py - Handles tool execution and result processing
 """
 import json
-from typing import Dict, List, Any, Optional
+import hashlib
+import itertools
+import logging
+import os
+import re
+import sys
+import orjson
+import threading
+import time
+from collections import Counter, OrderedDict
+from enum import Enum
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Any, Optional, Set, Tuple
 from mcp_manager import MCPManager
 
+try:
+    # Generates plain Python validators from each inputSchema once, instead of walking it per call
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+# Per-call traces are DEBUG, so their arguments are never formatted at the default INFO level.
+# Output keeps the [TOOL] console prefix; raise verbosity with logging.getLogger("tool_executor").setLevel(logging.DEBUG)
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(logging.Formatter("[TOOL] %(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# Tool names quoted back in a "tool not found" error (the result ends up in the LLM prompt)
+NOT_FOUND_TOOL_NAMES = 10
+
+# Successful tool results are reused for identical (tool, arguments) calls
+RESULT_CACHE_FILE = os.path.expanduser("~/.cache/warden/tool_results.json")
+RESULT_CACHE_SIZE = 4096
+# IP reputation moves fast; IOC feeds change more slowly
+RESULT_TTL_DEFAULT = 86400.0
+RESULT_TTL_BY_TOOL = {
+    'check_ip_reputation': 3600.0,
+    'check_multiple_ips': 3600.0,
+}
+
+@lru_cache(maxsize=256)
+def _compile_schema(schema_json: str) -> Callable:
+    """Compiled validator for a canonical inputSchema, shared across reconnects and identical tools"""
+    # use_default=False: validation must not inject schema defaults into the call arguments
+    return fastjsonschema.compile(json.loads(schema_json), use_default=False)
+
+class ToolStatus(str, Enum):
+    """Result status; a str subclass, so results still serialize and compare as success/error strings"""
+    SUCCESS = "success"
+    ERROR = "error"
+
+    __str__ = str.__str__
+
+# Schema keys that describe rather than constrain; a schema made only of these accepts any arguments
+_ANNOTATION_KEYS = frozenset({'type', 'properties', 'title', 'description', '$schema', 'default', 'examples'})
+
+def _constrains_arguments(schema: Dict[str, Any]) -> bool:
+    """Whether validating against this inputSchema can ever reject an arguments object"""
+    if schema.get('required') or set(schema) - _ANNOTATION_KEYS:
+        return True
+    if schema.get('type', 'object') != 'object':
+        return True
+    return any(set(prop) - _ANNOTATION_KEYS or 'type' in prop for prop in schema.get('properties', {}).values())
+
+# First non-whitespace character opens an object or array; match() stops right there
+_JSON_START = re.compile(r"\s*[\[{]")
+
+def _is_cacheable(result: Any) -> bool:
+    """Successful results only; servers report upstream failures as a normal payload with an "error" key"""
+    if not isinstance(result, dict) or result.get('status') != ToolStatus.SUCCESS:
+        return False
+    data = result.get('data')
+    return not (isinstance(data, dict) and 'error' in data)
+
+def _looks_like_json(text: str) -> bool:
+    """Cheap peek before attempting a full parse of a possibly very large tool output"""
+    return _JSON_START.match(text) is not None
+
+# Result summaries: exact tool names first, then tool name prefixes
+_SUMMARY_HANDLERS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    'list_indices': lambda data: f"Found {data.get('total_indices', 0)} Elasticsearch indices",
+    'cluster_health': lambda data: f"Cluster status: {data.get('status', 'unknown')} ({data.get('number_of_nodes', 0)} nodes)",
+    'check_ip_reputation': lambda data: (f"IP {data.get('ip', 'unknown')}: {data.get('abuseConfidenceScore', 0)}% confidence, "
+                                         f"threat level: {data.get('threat_level', 'unknown')}"),
+}
+_PREFIX_SUMMARY_HANDLERS = (
+    ('search_ip_', lambda data: f"Found {data.get('total_hits', 0)} results for IP {data.get('ip_searched', 'unknown')}"),
+    ('search_username_', lambda data: f"Found {data.get('total_hits', 0)} results for username {data.get('username_searched', 'unknown')}"),
+)
+
 class ToolExecutor:
     """Executes tools and processes results for the Warden"""
     
-    def __init__(self, mcp_manager: MCPManager):
+    def __init__(self, mcp_manager: MCPManager, max_workers: int = 8):
         self.mcp_manager = mcp_manager
+        # Worker threads for execute_tools_batch, started on demand and kept for later batches
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mcp-tool")
         self.available_tools = []
+        self._tool_index: Dict[str, Dict[str, Any]] = {}  # tool name -> tool, first definition wins
+        self._tool_names: List[str] = []
+        self._validators: Dict[str, Callable] = {}  # tool name -> compiled inputSchema validator
+        self._unconstrained: Set[str] = set()  # tools whose schema accepts any arguments
         self.execution_stats = {
             'total_calls': 0,
             'successful_calls': 0,
             'failed_calls': 0,
-            'tool_usage': {}
+            'cache_hits': 0,
+            'tool_usage': Counter()
         }
+        # cache key -> (expires_at, processed result), least recently used first
+        self.result_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._cache_lock = threading.Lock()  # Parallel tool calls share the cache
+        self._stats_lock = threading.Lock()  # ... and the execution stats
+        self._load_result_cache()
     
     def set_available_tools(self, tools: List[Dict[str, Any]]):
         """Set the list of available tools"""
         self.available_tools = tools
-        print(f"[TOOL] {len(tools)} tools available")
+        self._tool_index = {}
+        for tool in tools:
+            self._tool_index.setdefault(tool.get('name'), tool)
+        self._tool_names = [tool.get('name', 'Unknown') for tool in tools]
+        self._unconstrained = {name for name, tool in self._tool_index.items()
+                               if not _constrains_arguments(tool.get('inputSchema', {}))}
+        self._validators = self._compile_validators(tools)
+        logger.info("%d tools available", len(tools))
     
-    def get_tool_descriptions(self) -> List[Dict[str, str]]:
-        """Get simplified tool descriptions for the LLM"""
-        descriptions = []
+    def _compile_validators(self, tools: List[Dict[str, Any]]) -> Dict[str, Callable]:
+        """Compile every tool's inputSchema once; tools left out fall back to the basic checks"""
+        if fastjsonschema is None:
+            return {}
+        validators = {}
+        for tool in tools:
+            try:
+                schema_json = json.dumps(tool.get('inputSchema', {}), sort_keys=True)
+                validators[tool.get('name')] = _compile_schema(schema_json)
+            except fastjsonschema.JsonSchemaDefinitionException as e:
+                logger.warning("Could not compile schema for %s: %s", tool.get('name'), e)
+        return validators
+    
+    def iter_tool_descriptions(self) -> Iterator[Dict[str, str]]:
+        """Simplified tool descriptions for the LLM, built as they are consumed"""
         for tool in self.available_tools:
-            descriptions.append({
+            yield {
                 'name': tool.get('name', 'Unknown'),
                 'description': tool.get('description', 'No description'),
                 'server': tool.get('server', 'Unknown')
-            })
-        return descriptions
+            }
+    
+    def get_tool_descriptions(self) -> List[Dict[str, str]]:
+        """Get simplified tool descriptions for the LLM"""
+        return list(self.iter_tool_descriptions())
     
     def get_tools_by_server(self) -> Dict[str, List[Dict[str, str]]]:
         """Get tools grouped by server"""
@@ -49,35 +175,61 @@ class ToolExecutor:
         
         return tools_by_server
     
-    def execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Execute a specific tool with given arguments"""
-        print(f"[TOOL] Executing {tool_name} with args: {arguments}")
+    def execute_tool(self, tool_name: str, arguments: Dict[str, Any], force_refresh: bool = False,
+                     include_raw: bool = False) -> Optional[Dict[str, Any]]:
+        """Execute a specific tool with given arguments.
         
-        # Update stats
-        self.execution_stats['total_calls'] += 1
-        if tool_name not in self.execution_stats['tool_usage']:
-            self.execution_stats['tool_usage'][tool_name] = 0
-        self.execution_stats['tool_usage'][tool_name] += 1
+        include_raw adds the unparsed text as 'raw_content' (for debugging). Those
+        results bypass the result cache, which only holds the lean form.
+        """
+        cache_key = self._result_cache_key(tool_name, arguments)
+        if not force_refresh and not include_raw:
+            cached = self._get_cached_result(cache_key)
+            if cached is not None:
+                logger.debug("Cache hit for %s with args: %s", tool_name, arguments)
+                self._record_call(tool_name, True, cache_hit=True)
+                return cached
         
-        # Validate tool exists
-        if not self._tool_exists(tool_name):
-            print(f"[TOOL] Tool '{tool_name}' not found")
-            self.execution_stats['failed_calls'] += 1
+        logger.debug("Executing %s with args: %s", tool_name, arguments)
+        
+        result = None
+        try:
+            result = self._execute_uncached(tool_name, arguments, cache_key, include_raw)
+            return result
+        finally:
+            self._record_call(tool_name, bool(result) and result.get('status') == ToolStatus.SUCCESS)
+    
+    def _record_call(self, tool_name: str, succeeded: bool, cache_hit: bool = False):
+        """Update stats: one lock and one dict binding per call, outcome included"""
+        stats = self.execution_stats
+        with self._stats_lock:
+            stats['total_calls'] += 1
+            stats['tool_usage'][tool_name] += 1
+            stats['successful_calls' if succeeded else 'failed_calls'] += 1
+            if cache_hit:
+                stats['cache_hits'] += 1
+    
+    def _execute_uncached(self, tool_name: str, arguments: Dict[str, Any], cache_key: str,
+                          include_raw: bool) -> Dict[str, Any]:
+        """Validate and run one tool call; successful results are stored under cache_key"""
+        # Validate tool exists (the one lookup; validation works from this entry)
+        tool = self._tool_index.get(tool_name)
+        if tool is None:
+            logger.warning("Tool '%s' not found", tool_name)
             return {
                 'tool': tool_name,
-                'status': 'error',
+                'status': ToolStatus.ERROR,
                 'error': f"Tool '{tool_name}' not found",
-                'available_tools': self.list_available_tools()
+                'available_tools': list(itertools.islice(self.iter_available_tool_names(), NOT_FOUND_TOOL_NAMES))
             }
         
         # Validate arguments based on tool schema
-        validation_result = self._validate_arguments(tool_name, arguments)
+        validation_result = self._validate_arguments(tool, arguments)
         if not validation_result['valid']:
-            print(f"[TOOL] Invalid arguments for {tool_name}: {validation_result['error']}")
-            self.execution_stats['failed_calls'] += 1
+            logger.warning("Invalid arguments for %s: %s", tool_name, validation_result['error'])
             return {
                 'tool': tool_name,
-                'status': 'error',
+                'status': ToolStatus.ERROR,
                 'error': f"Invalid arguments: {validation_result['error']}",
                 'expected_schema': validation_result.get('schema')
             }
@@ -86,53 +238,178 @@ class ToolExecutor:
         raw_result = self.mcp_manager.call_tool(tool_name, arguments)
         
         if not raw_result:
-            print(f"[TOOL] Tool execution failed - no response")
-            self.execution_stats['failed_calls'] += 1
+            logger.warning("Tool execution failed - no response from %s", tool_name)
             return {
                 'tool': tool_name,
-                'status': 'error',
+                'status': ToolStatus.ERROR,
                 'error': 'No response from tool execution'
             }
         
         # Check for JSON-RPC errors
         if 'error' in raw_result:
             error_info = raw_result['error']
-            print(f"[TOOL] Tool execution error: {error_info}")
-            self.execution_stats['failed_calls'] += 1
+            logger.warning("Tool execution error from %s: %s", tool_name, error_info)
             return {
                 'tool': tool_name,
-                'status': 'error',
+                'status': ToolStatus.ERROR,
                 'error': error_info.get('message', 'Unknown error'),
                 'error_code': error_info.get('code'),
                 'raw_error': error_info
             }
         
         # Process and clean up the result
-        processed_result = self._process_tool_result(tool_name, raw_result)
+        processed_result = self._process_tool_result(tool_name, raw_result, include_raw)
         
-        if processed_result.get('status') == 'success':
-            self.execution_stats['successful_calls'] += 1
-            print(f"[TOOL] Tool execution successful")
+        if processed_result.get('status') == ToolStatus.SUCCESS:
+            logger.debug("Tool execution successful: %s", tool_name)
+            if not include_raw and _is_cacheable(processed_result):
+                self._cache_result(cache_key, tool_name, processed_result)
         else:
-            self.execution_stats['failed_calls'] += 1
-            print(f"[TOOL] Tool execution completed with issues")
+            logger.warning("Tool execution completed with issues: %s", tool_name)
         
         return processed_result
     
-    def _tool_exists(self, tool_name: str) -> bool:
-        """Check if a tool exists in the available tools"""
-        for tool in self.available_tools:
-            if tool.get('name') == tool_name:
-                return True
-        return False
+    def execute_tools_batch(self, calls: List[Tuple[str, Dict[str, Any]]], max_concurrent: int = 8,
+                            force_refresh: bool = False, stop_on_error: bool = False,
+                            timeout: Optional[float] = None) -> List[Optional[Dict[str, Any]]]:
+        """Execute independent tool calls concurrently; results come back in call order.
+        
+        At most max_concurrent calls of the batch run at once. stop_on_error skips
+        calls that have not started once one fails. Calls still running after
+        `timeout` seconds are reported as errors and left to finish in the background.
+        """
+        if not calls:
+            return []
+        
+        # The shared pool is reused across batches; max_concurrent caps this batch's share of it
+        futures: List[Optional[Future]] = [None] * len(calls)
+        next_call = 0
+        running = set()
+        
+        def launch():
+            nonlocal next_call
+            while next_call < len(calls) and len(running) < max_concurrent:
+                tool_name, arguments = calls[next_call]
+                future = self._executor.submit(self.execute_tool, tool_name, arguments, force_refresh)
+                futures[next_call] = future
+                running.add(future)
+                next_call += 1
+        
+        deadline = None if timeout is None else time.monotonic() + timeout
+        timed_out = False
+        launch()
+        while running:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, running = wait(running, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                timed_out = True
+                break
+            if stop_on_error and any(self._call_failed(future) for future in done):
+                break
+            launch()
+        
+        results = []
+        for (tool_name, _), future in zip(calls, futures):
+            if future is not None and future.done():
+                results.append(future.result())
+            else:
+                reason = f"Timed out after {timeout}s" if timed_out else "Skipped after an earlier call in the batch failed"
+                logger.warning("%s: %s", tool_name, reason)
+                results.append({'tool': tool_name, 'status': ToolStatus.ERROR, 'error': reason})
+        return results
+    
+    @staticmethod
+    def _call_failed(future: Future) -> bool:
+        """Whether a finished batch call raised or returned an error result"""
+        if future.exception() is not None:
+            return True
+        result = future.result()
+        return not result or result.get('status') == ToolStatus.ERROR
+    
+    def _result_cache_key(self, tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Stable key for a tool call, independent of argument order"""
+        canonical = json.dumps([tool_name, arguments], sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+    
+    def _get_cached_result(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh cached result and mark it recently used"""
+        with self._cache_lock:
+            entry = self.result_cache.get(cache_key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self.result_cache[cache_key]
+                return None
+            self.result_cache.move_to_end(cache_key)
+            return entry[1]
+    
+    def _cache_result(self, cache_key: str, tool_name: str, result: Dict[str, Any]):
+        """Store a successful result, evicting the least recently used past the size cap"""
+        ttl = RESULT_TTL_BY_TOOL.get(tool_name, RESULT_TTL_DEFAULT)
+        with self._cache_lock:
+            self.result_cache[cache_key] = (time.time() + ttl, result)
+            self.result_cache.move_to_end(cache_key)
+            while len(self.result_cache) > RESULT_CACHE_SIZE:
+                self.result_cache.popitem(last=False)
+    
+    def _load_result_cache(self):
+        """Load unexpired results saved by a previous run"""
+        try:
+            with open(RESULT_CACHE_FILE, 'r') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(entries, list):
+            return
+        now = time.time()
+        for entry in entries:
+            # Skip anything that is not a [key, expires_at, result] triple from save_result_cache
+            try:
+                cache_key, expires_at, result = entry
+                if expires_at > now and _is_cacheable(result):
+                    self.result_cache[cache_key] = (expires_at, result)
+            except (TypeError, ValueError):
+                continue
     
-    def _validate_arguments(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
-        """Validate arguments against tool schema"""
-        tool_info = self.get_tool_help(tool_name)
-        if not tool_info:
-            return {'valid': False, 'error': 'Tool not found'}
+    def close(self):
+        """Release the batch worker threads (calls still running finish in the background)"""
+        self._executor.shutdown(wait=False)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def save_result_cache(self):
+        """Persist unexpired results so the next run can reuse them"""
+        now = time.time()
+        entries = [[key, expires_at, result] for key, (expires_at, result) in self.result_cache.items() if expires_at > now]
+        try:
+            os.makedirs(os.path.dirname(RESULT_CACHE_FILE), exist_ok=True)
+            with open(RESULT_CACHE_FILE, 'w') as f:
+                json.dump(entries, f, default=str)
+        except OSError as e:
+            logger.warning("Could not save result cache: %s", e)
+    
+    def _validate_arguments(self, tool: Dict[str, Any], arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate arguments against the schema of an available tool"""
+        if tool.get('name') in self._unconstrained:
+            return {'valid': True}
+        schema = tool.get('inputSchema', {})
+        validator = self._validators.get(tool.get('name'))
+        if validator is not None:
+            try:
+                validator(arguments)
+                return {'valid': True}
+            except fastjsonschema.JsonSchemaValueException as e:
+                return {
+                    'valid': False,
+                    'error': e.message,
+                    'schema': schema
+                }
         
-        schema = tool_info.get('inputSchema', {})
+        # Without fastjsonschema: required fields and basic types only
         properties = schema.get('properties', {})
         required = schema.get('required', [])
         
@@ -176,7 +453,7 @@ class ToolExecutor:
         
         return {'valid': True}
     
-    def _process_tool_result(self, tool_name: str, raw_result: Dict[str, Any]) -> Dict[str, Any]:
+    def _process_tool_result(self, tool_name: str, raw_result: Dict[str, Any], include_raw: bool = False) -> Dict[str, Any]:
         """Process raw tool results into a clean format"""
         try:
             # Extract the actual result content
@@ -188,53 +465,48 @@ class ToolExecutor:
                     text_content = content[0].get('text', '')
                     
                     # Try to parse as JSON if it looks like JSON
-                    if text_content.strip().startswith('{') or text_content.strip().startswith('['):
+                    if _looks_like_json(text_content):
                         try:
-                            parsed_data = json.loads(text_content)
+                            parsed_data = orjson.loads(text_content)
                             
+                            result = {
+                                'tool': tool_name,
+                                'status': ToolStatus.SUCCESS,
+                                'data': parsed_data
+                            }
                             # Special processing for different tool types
                             if tool_name.startswith('search_') or tool_name.startswith('list_'):
                                 # For search and list tools, provide summary info
-                                summary = self._generate_result_summary(tool_name, parsed_data)
-                                return {
-                                    'tool': tool_name,
-                                    'status': 'success',
-                                    'data': parsed_data,
-                                    'summary': summary,
-                                    'raw_content': text_content
-                                }
-                            else:
-                                return {
-                                    'tool': tool_name,
-                                    'status': 'success',
-                                    'data': parsed_data,
-                                    'raw_content': text_content
-                                }
-                        except json.JSONDecodeError as e:
-                            print(f"[TOOL] JSON decode error for {tool_name}: {e}")
+                                result['summary'] = self._generate_result_summary(tool_name, parsed_data)
+                            if include_raw:
+                                result['raw_content'] = text_content
+                            return result
+                        except orjson.JSONDecodeError as e:
+                            logger.warning("JSON decode error for %s: %s", tool_name, e)
                             pass
                     
-                    # Return as plain text if not JSON
+                    # Return as plain text if not JSON (data already is the raw text)
                     return {
                         'tool': tool_name,
-                        'status': 'success',
-                        'data': text_content,
-                        'raw_content': text_content
+                        'status': ToolStatus.SUCCESS,
+                        'data': text_content
                     }
             
             # Fallback - return the raw result
-            return {
+            result = {
                 'tool': tool_name,
-                'status': 'success',
-                'data': raw_result,
-                'raw_content': str(raw_result)
+                'status': ToolStatus.SUCCESS,
+                'data': raw_result
             }
+            if include_raw:
+                result['raw_content'] = str(raw_result)
+            return result
             
         except Exception as e:
-            print(f"[TOOL] Error processing result from {tool_name}: {e}")
+            logger.error("Error processing result from %s: %s", tool_name, e)
             return {
                 'tool': tool_name,
-                'status': 'error',
+                'status': ToolStatus.ERROR,
                 'error': str(e),
                 'raw_result': raw_result
             }
@@ -242,55 +514,37 @@ class ToolExecutor:
     def _generate_result_summary(self, tool_name: str, data: Dict[str, Any]) -> str:
         """Generate a human-readable summary of tool results"""
         try:
-            if tool_name == 'list_indices':
-                total = data.get('total_indices', 0)
-                return f"Found {total} Elasticsearch indices"
-            
-            elif tool_name.startswith('search_ip_'):
-                ip = data.get('ip_searched', 'unknown')
-                hits = data.get('total_hits', 0)
-                return f"Found {hits} results for IP {ip}"
-            
-            elif tool_name.startswith('search_username_'):
-                username = data.get('username_searched', 'unknown')
-                hits = data.get('total_hits', 0)
-                return f"Found {hits} results for username {username}"
-            
-            elif tool_name == 'cluster_health':
-                status = data.get('status', 'unknown')
-                nodes = data.get('number_of_nodes', 0)
-                return f"Cluster status: {status} ({nodes} nodes)"
-            
-            elif tool_name == 'check_ip_reputation':
-                ip = data.get('ip', 'unknown')
-                confidence = data.get('abuseConfidenceScore', 0)
-                threat = data.get('threat_level', 'unknown')
-                return f"IP {ip}: {confidence}% confidence, threat level: {threat}"
-            
-            elif 'error' in data:
+            handler = _SUMMARY_HANDLERS.get(tool_name)
+            if handler is None:
+                handler = next((h for prefix, h in _PREFIX_SUMMARY_HANDLERS if tool_name.startswith(prefix)), None)
+            if handler is not None:
+                return handler(data)
+            if 'error' in data:
                 return f"Error: {data['error']}"
-            
-            else:
-                return f"Tool executed successfully"
+            return f"Tool executed successfully"
                 
         except Exception as e:
             return f"Summary generation failed: {str(e)}"
     
     def get_tool_help(self, tool_name: str) -> Optional[Dict[str, Any]]:
         """Get help information for a specific tool"""
-        for tool in self.available_tools:
-            if tool.get('name') == tool_name:
-                return {
-                    'name': tool.get('name'),
-                    'description': tool.get('description'),
-                    'server': tool.get('server'),
-                    'inputSchema': tool.get('inputSchema', {})
-                }
-        return None
+        tool = self._tool_index.get(tool_name)
+        if tool is None:
+            return None
+        return {
+            'name': tool.get('name'),
+            'description': tool.get('description'),
+            'server': tool.get('server'),
+            'inputSchema': tool.get('inputSchema', {})
+        }
+    
+    def iter_available_tool_names(self) -> Iterator[str]:
+        """Available tool names, lazily"""
+        return iter(self._tool_names)
     
     def list_available_tools(self) -> List[str]:
-        """Get a list of available tool names"""
-        return [tool.get('name', 'Unknown') for tool in self.available_tools]
+        """Get a list of available tool names (shared list, do not modify)"""
+        return self._tool_names
     
     def get_execution_stats(self) -> Dict[str, Any]:
         """Get tool execution statistics"""
@@ -309,19 +563,14 @@ class ToolExecutor:
             'total_calls': 0,
             'successful_calls': 0,
             'failed_calls': 0,
-            'tool_usage': {}
+            'cache_hits': 0,
+            'tool_usage': Counter()
         }
-        print("[TOOL] Statistics reset")
+        logger.info("Statistics reset")
     
     def get_popular_tools(self, limit: int = 5) -> List[Dict[str, Any]]:
         """Get most frequently used tools"""
-        sorted_tools = sorted(
-            self.execution_stats['tool_usage'].items(),
-            key=lambda x: x[1],
-            reverse=True
-        )
-        
         return [
             {'tool': tool_name, 'usage_count': count}
-            for tool_name, count in sorted_tools[:limit]
+            for tool_name, count in self.execution_stats['tool_usage'].most_common(limit)
         ]
\ No newline at end of file
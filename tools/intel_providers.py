@@ -1,111 +1,263 @@
 # tools/intel_providers.py
+import functools
+import inspect
 import os
+import re
+import threading
+import time
 import requests
 import ipaddress
+import orjson
+from collections import OrderedDict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Any
 from dotenv import load_dotenv
 
+try:
+    # Optional: get_iocs bodies are parsed entry by entry instead of held whole
+    import ijson
+except ImportError:
+    ijson = None
+
 load_dotenv()
 
 THREATFOX_API_KEY = os.getenv("THREATFOX_API_KEY")
 ABUSEIPDB_API_KEY = os.getenv("ABUSEIPDB_API_KEY")
 
-def query_threatfox(days: int = 1):
-    print(f"Here ate query_threatfox()")
-    url = "https://threatfox-api.abuse.ch/api/v1/"
+# One keep-alive session so repeat lookups skip the TCP+TLS handshake
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20,
+                                       max_retries=Retry(total=2, backoff_factor=0.3)))
+_SESSION.headers.update({"Accept": "application/json", "Connection": "keep-alive"})
+
+# Lookups are stable for minutes to hours; repeats skip the round trip and the API quota
+LOOKUP_CACHE_TTL = 3600
+LOOKUP_CACHE_SIZE = 10_000
+
+class _TTLCache:
+    """Thread-safe LRU of key -> value that expires entries after `ttl` seconds"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()  # key -> (stored_at, value), oldest first
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] >= self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+def _is_error(result) -> bool:
+    return isinstance(result, dict) and "error" in result
+
+def cached_lookup(cache: _TTLCache):
+    """Serve a lookup from `cache`, keyed on its first argument; only successful results are stored."""
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def key_of(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return next(iter(bound.arguments.values()))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = key_of(args, kwargs)
+            result = cache.get(key)
+            if result is None:
+                result = func(*args, **kwargs)
+                if not _is_error(result):
+                    cache.put(key, result)
+            return result
+        wrapper.clear = cache.clear
+        return wrapper
+    return decorator
+
+_THREATFOX_CACHE = _TTLCache(LOOKUP_CACHE_SIZE, LOOKUP_CACHE_TTL)
+_ABUSEIP_CACHE = _TTLCache(LOOKUP_CACHE_SIZE, LOOKUP_CACHE_TTL)
+
+# Dotted-quad IPv4 exactly as ipaddress accepts it: ASCII digits, 0-255, no leading zeros
+_IPV4_RE = re.compile(r"(?:(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])\.){3}(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])")
+
+def is_valid_ip(value: str) -> bool:
+    """Regex fast path for IPv4; ipaddress only for strings that could be IPv6"""
+    if _IPV4_RE.fullmatch(value):
+        return True
+    if ":" not in value:
+        return False
+    try:
+        ipaddress.ip_address(value)
+        return True
+    except ValueError:
+        return False
+
+THREATFOX_URL = "https://threatfox-api.abuse.ch/api/v1/"
+ABUSEIPDB_URL = "https://api.abuseipdb.com/api/v2/check"
+
+def _threatfox_headers():
     headers = {
-        "Accept": "application/json",
         "Content-Type": "application/json"
     }
     if THREATFOX_API_KEY:
         headers["Auth-Key"] = THREATFOX_API_KEY
+    return headers
 
+@cached_lookup(_THREATFOX_CACHE)
+def query_threatfox(days: int = 1):
+    print(f"Here ate query_threatfox()")
     payload = {
         "query": "get_iocs",
         "days": days
     }
 
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
-        data = response.json()
-
-        if data.get("query_status") != "ok":
-            return {"error": "ThreatFox API error", "details": data}
-
-        results = []
-        for entry in data.get("data", []):
-            if entry["ioc_type"] in ["ip:port", "ip"]:
-                ip = entry["ioc"].split(":")[0]
-                try:
-                    ipaddress.ip_address(ip)
-                except ValueError:
-                    continue
-
-                results.append({
-                    "ip": ip,
-                    "threat_type": entry.get("threat_type", "Unknown"),
-                    "malware": entry.get("malware", "Unknown"),
-                    "confidence": entry.get("confidence_level", 0),
-                    "tags": entry.get("tags", []),
-                    "first_seen": entry.get("first_seen", ""),
-                    "last_seen": entry.get("last_seen", ""),
-                    "source": "ThreatFox"
-                })
+        if ijson is None:
+            response = _SESSION.post(THREATFOX_URL, headers=_threatfox_headers(), json=payload, timeout=10)
+            return _threatfox_results(orjson.loads(response.content))
+
+        with _SESSION.post(THREATFOX_URL, headers=_threatfox_headers(), json=payload, timeout=10, stream=True) as response:
+            response.raw.decode_content = True  # ijson reads the socket directly; undo gzip there
+            status, results = _stream_threatfox(response.raw)
+        if status != "ok":
+            return {"error": "ThreatFox API error", "details": {"query_status": status}}
         return results
 
     except Exception as e:
         return {"error": f"ThreatFox request failed: {str(e)}"}
 
+def _stream_threatfox(body):
+    """(query_status, IP IOCs) from a get_iocs body read incrementally; only one entry is built at a time"""
+    status = None
 
-def query_abuseip(ip: str):
-    print(f"Here at query_abuseip()")
+    def entries():
+        nonlocal status
+        builder = None
+        for prefix, event, value in ijson.parse(body, use_float=True):
+            if prefix == "data.item":
+                if event == "start_map":
+                    builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+                if event == "end_map":
+                    yield builder.value
+                    builder = None
+            elif builder is not None:
+                builder.event(event, value)
+            elif prefix == "query_status" and event == "string":
+                status = value
+
+    # query_status may follow the data, so it is only known once the body is consumed
+    results = _ip_iocs(entries())
+    return status, results
+
+def _threatfox_results(data):
+    """IP IOCs from a decoded get_iocs response"""
+    if data.get("query_status") != "ok":
+        return {"error": "ThreatFox API error", "details": data}
+    return _ip_iocs(data.get("data", []))
+
+def _ip_iocs(entries):
+    """Valid IP / IP:port entries reduced to the fields callers use"""
+    results = []
+    for entry in entries:
+        if entry["ioc_type"] in ("ip:port", "ip"):
+            ip = entry["ioc"].partition(":")[0]
+            if not is_valid_ip(ip):
+                continue
+
+            results.append({
+                "ip": ip,
+                "threat_type": entry.get("threat_type", "Unknown"),
+                "malware": entry.get("malware", "Unknown"),
+                "confidence": entry.get("confidence_level", 0),
+                "tags": entry.get("tags", []),
+                "first_seen": entry.get("first_seen", ""),
+                "last_seen": entry.get("last_seen", ""),
+                "source": "ThreatFox"
+            })
+    return results
+
+
+def _abuseip_check(ip: str):
+    """Error dict when ip cannot be looked up, else None"""
     if not ABUSEIPDB_API_KEY:
         return {"error": "AbuseIPDB API key not configured"}
 
-    try:
-        ipaddress.ip_address(ip)
-    except ValueError:
+    if not is_valid_ip(ip):
         return {"error": "Invalid IP address"}
+    return None
 
-    url = "https://api.abuseipdb.com/api/v2/check"
+def _abuseip_request(ip: str):
     headers = {
-        "Key": ABUSEIPDB_API_KEY,
-        "Accept": "application/json"
+        "Key": ABUSEIPDB_API_KEY
     }
     params = {
         "ipAddress": ip,
         "maxAgeInDays": "365"
     }
+    return headers, params
 
-    try:
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        if response.status_code != 200:
-            return {"error": f"AbuseIPDB API error: {response.status_code}", "details": response.text}
-
-        data = response.json()
-        if "data" not in data:
-            return {"error": "Unexpected AbuseIPDB response", "details": data}
-
-        d = data["data"]
-        # print(d)
-        return {
-            "ip": ip,
-            "abuse_confidence": d.get("abuseConfidenceScore", 0),
-            "country": d.get("countryCode", "Unknown"),
-            "usage_type": d.get("usageType", "Unknown"),
-            "isp": d.get("isp", "Unknown"),
-            "domain": d.get("domain", "Unknown"),
-            "total_reports": d.get("totalReports", 0),
-            "num_distinct_users": d.get("numDistinctUsers", 0),
-            "last_reported": d.get("lastReportedAt", ""),
-            "is_public": d.get("isPublic", False),
-            "is_whitelisted": d.get("isWhitelisted", False),
-            "source": "AbuseIPDB"
-        }
+@cached_lookup(_ABUSEIP_CACHE)
+def query_abuseip(ip: str):
+    print(f"Here at query_abuseip()")
+    error = _abuseip_check(ip)
+    if error:
+        return error
 
+    headers, params = _abuseip_request(ip)
+    try:
+        response = _SESSION.get(ABUSEIPDB_URL, headers=headers, params=params, timeout=10)
+        return _abuseip_result(ip, response)
 
     except Exception as e:
         return {"error": f"AbuseIPDB request failed: {str(e)}"}
 
-print(query_abuseip("34.238.45.183"))
-results = query_threatfox()
-print(results[-1])
\ No newline at end of file
+def _abuseip_result(ip: str, response):
+    """Reputation summary from an AbuseIPDB check response"""
+    if response.status_code != 200:
+        return {"error": f"AbuseIPDB API error: {response.status_code}", "details": response.text}
+
+    data = response.json()
+    if "data" not in data:
+        return {"error": "Unexpected AbuseIPDB response", "details": data}
+
+    d = data["data"]
+    # print(d)
+    return {
+        "ip": ip,
+        "abuse_confidence": d.get("abuseConfidenceScore", 0),
+        "country": d.get("countryCode", "Unknown"),
+        "usage_type": d.get("usageType", "Unknown"),
+        "isp": d.get("isp", "Unknown"),
+        "domain": d.get("domain", "Unknown"),
+        "total_reports": d.get("totalReports", 0),
+        "num_distinct_users": d.get("numDistinctUsers", 0),
+        "last_reported": d.get("lastReportedAt", ""),
+        "is_public": d.get("isPublic", False),
+        "is_whitelisted": d.get("isWhitelisted", False),
+        "source": "AbuseIPDB"
+    }
+
+
+if __name__ == "__main__":
+    print(query_abuseip("34.238.45.183"))
+    results = query_threatfox()
+    print(results[-1] if isinstance(results, list) and results else results)
\ No newline at end of file